@@ -5,8 +5,9 @@ from sqlalchemy import func, desc, case
 from datetime import datetime, timedelta
 
 from app.core import deps
-from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.learning_progress import LearningStatus
 from app.models.learning_progress_log import LearningProgressLog
+from app.models.learning_set_stats import LearningSetStats
 from app.models.study_set import StudySet
 from app.models.user import User
 
@@ -71,26 +72,21 @@ def get_progress_distribution(
     """
     Get the distribution of learning status (Not Started, Familiar, Mastered).
     """
-    distribution = (
+    not_started, familiar, mastered = (
         db.query(
-            LearningProgress.status,
-            func.count(LearningProgress.id).label("count")
+            func.coalesce(func.sum(LearningSetStats.not_started), 0),
+            func.coalesce(func.sum(LearningSetStats.familiar), 0),
+            func.coalesce(func.sum(LearningSetStats.mastered), 0),
         )
-        .filter(LearningProgress.user_id == current_user.id)
-        .group_by(LearningProgress.status)
-        .all()
+        .filter(LearningSetStats.user_id == current_user.id)
+        .one()
     )
     
-    # Initialize with 0
     result = {
-        LearningStatus.NOT_STARTED.value: 0,
-        LearningStatus.FAMILIAR.value: 0,
-        LearningStatus.MASTERED.value: 0
+        LearningStatus.NOT_STARTED.value: int(not_started),
+        LearningStatus.FAMILIAR.value: int(familiar),
+        LearningStatus.MASTERED.value: int(mastered)
     }
-    
-    for status, count in distribution:
-        if status in result:
-            result[status] = count
             
     return [
         {"name": "Not Started", "value": result[LearningStatus.NOT_STARTED.value]},
@@ -148,6 +144,8 @@ def get_forgetting_curve(
     logs.reverse()
     
     for log in logs:
+        if log.term_id is None:
+            continue  # Term was removed from its set
         if log.term_id not in term_logs:
             term_logs[log.term_id] = log.created_at
         else:
@@ -217,24 +215,9 @@ def get_study_set_stats(
     """
     # Verify ownership or visibility (omitted for brevity, assuming public or owned)
     
-    total_terms = (
-        db.query(func.count(LearningProgress.id))
-        .filter(
-            LearningProgress.user_id == current_user.id,
-            LearningProgress.study_set_id == set_id
-        )
-        .scalar()
-    )
-    
-    mastered = (
-        db.query(func.count(LearningProgress.id))
-        .filter(
-            LearningProgress.user_id == current_user.id,
-            LearningProgress.study_set_id == set_id,
-            LearningProgress.status == LearningStatus.MASTERED
-        )
-        .scalar()
-    )
+    stats = db.get(LearningSetStats, (current_user.id, set_id))
+    total_terms = stats.not_started + stats.familiar + stats.mastered if stats else 0
+    mastered = stats.mastered if stats else 0
     
     return {
         "total_terms": total_terms,
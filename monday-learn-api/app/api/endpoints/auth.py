@@ -2,18 +2,35 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
 from app.models.login_log import LoginLog
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, invalidate_cached_user
 from app.schemas.user import UserCreate, UserResponse
 from app.schemas.token import Token
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_password_async, create_access_token
 from app.core.config import settings
 
 router = APIRouter()
 
+def _find_login_user(db: Session, identifier: str) -> User | None:
+    # Find user by email or username
+    return db.query(User).filter((User.email == identifier) | (User.username == identifier)).first()
+
+
+def _record_login(db: Session, user_id: int | None, ip_address: str | None, user_agent: str | None, login_status: str) -> None:
+    log = LoginLog(
+        user_id=user_id,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        status=login_status
+    )
+    db.add(log)
+    db.commit()
+
+
 @router.post("/login", response_model=Token)
 async def login_access_token(
     request: Request,
@@ -21,54 +38,44 @@ async def login_access_token(
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
-    OAuth2 compatible token login, get an access token for future requests
+    OAuth2 compatible token login, get an access token for future requests.
+    Blocking DB calls run in the thread pool and bcrypt in its own capped pool,
+    so a login storm does not stall the event loop.
     """
-    # Find user by email or username
-    user = db.query(User).filter((User.email == form_data.username) | (User.username == form_data.username)).first()
+    user = await run_in_threadpool(_find_login_user, db, form_data.username)
     
     # Prepare log data
     ip_address = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent")
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         # Log failed attempt
-        log = LoginLog(
-            user_id=user.id if user else None,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            status="failed"
-        )
-        db.add(log)
-        db.commit()
+        await run_in_threadpool(_record_login, db, user.id if user else None, ip_address, user_agent, "failed")
         
         raise HTTPException(status_code=400, detail="Incorrect email/username or password")
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+
+    # Read what the token needs before commit expires the instance
+    user_id, username, role = user.id, user.username, user.role
         
     # Log success
-    log = LoginLog(
-        user_id=user.id,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        status="success"
-    )
-    db.add(log)
-    db.commit()
+    await run_in_threadpool(_record_login, db, user_id, ip_address, user_agent, "success")
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username, "role": user.role},
+        data={"sub": username, "role": role},
         expires_delta=access_token_expires
     )
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "role": user.role,
+        "role": role,
     }
 
-@router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
+
+def _check_signup_allowed(db: Session, user: UserCreate) -> str:
     # Check if user already exists
     db_user = db.query(User).filter((User.email == user.email) | (User.username == user.username)).first()
     if db_user:
@@ -92,9 +99,22 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Admin user already exists"
             )
+    return requested_role
+
+
+def _create_user(db: Session, new_user: User) -> User:
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+
+@router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def signup(user: UserCreate, db: Session = Depends(get_db)):
+    requested_role = await run_in_threadpool(_check_signup_allowed, db, user)
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     new_user = User(
         email=user.email,
         username=user.username,
@@ -102,11 +122,7 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
         role=requested_role,
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
+    return await run_in_threadpool(_create_user, db, new_user)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -122,6 +138,8 @@ async def update_me(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    previous_username = current_user.username
+
     # Check if username is taken (if changed)
     if payload.username and payload.username != current_user.username:
         existing_user = db.query(User).filter(User.username == payload.username).first()
@@ -137,5 +155,6 @@ async def update_me(
         
     db.add(current_user)
     db.commit()
+    invalidate_cached_user(previous_username, current_user.username)
     db.refresh(current_user)
     return current_user
@@ -4,6 +4,7 @@ from sqlalchemy import func
 from typing import List, Dict, Any
 from datetime import date, datetime, timedelta
 from app.core import deps
+from app.db.session import AsyncDB, get_async_db
 from app.models.user import User
 from app.models.daily_learning_summary import DailyLearningSummary
 from app.models.learning_progress_log import LearningProgressLog
@@ -31,12 +32,11 @@ class DailyDetailResponse(BaseModel):
     items: List[DailyDetailItem]
     mastered_count: int
 
-@router.get("/monthly", response_model=List[DailySummaryResponse])
-def get_monthly_calendar(
+def _get_monthly_calendar(
+    db: Session,
+    current_user: User,
     start_date: date | None = None,
     end_date: date | None = None,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
 ):
     if not start_date:
         start_date = date.today().replace(day=1)
@@ -65,11 +65,19 @@ def get_monthly_calendar(
         for s in summaries
     ]
 
-@router.get("/daily/{target_date}", response_model=DailyDetailResponse)
-def get_daily_detail(
+@router.get("/monthly", response_model=List[DailySummaryResponse])
+async def get_monthly_calendar(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
+):
+    return await db.run_sync(_get_monthly_calendar, current_user, start_date, end_date)
+
+def _get_daily_detail(
+    db: Session,
+    current_user: User,
     target_date: date,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
 ):
     # 1. Get Summary
     summary = (
@@ -159,3 +167,11 @@ def get_daily_detail(
         items=items,
         mastered_count=mastered_count
     )
+
+@router.get("/daily/{target_date}", response_model=DailyDetailResponse)
+async def get_daily_detail(
+    target_date: date,
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
+):
+    return await db.run_sync(_get_daily_detail, current_user, target_date)
@@ -1,20 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_, case, func, insert, select, text
 from sqlalchemy.orm import Session
 from typing import List, Any, Dict
 from datetime import datetime, timedelta
 from loguru import logger
 
 from app.core import deps
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.export import ExportFormat, export_response
+from app.db.learning_logs import learning_log_writer, write_learning_logs
+from app.db.learning_stats import bump_set_stats, rebuild_set_stats, status_change
+from app.db.session import AsyncDB, get_async_db
 from app.models.user import User
 from app.models.study_set import StudySet, Term
 from app.models.learning_progress import LearningProgress, LearningStatus
 from app.models.learning_progress_log import LearningProgressLog
+from app.models.learning_set_stats import LearningSetStats
+from app.models.learning_term_stats import LearningTermStats
 from app.models.ai_config import AIConfig
 from app.models.ai_usage_log import AIUsageLog
 from app.models.learning_report import LearningReport
-from app.models.daily_learning_summary import DailyLearningSummary
+from app.models.study_group import StudyGroup
+from app.models.class_member import class_members
 from app.schemas.learning_progress import (
     LearningProgressUpdate,
+    LearningProgressBatchUpdate,
     LearningProgressResponse,
     LearningSession,
 )
@@ -30,6 +41,13 @@ import random
 router = APIRouter()
 
 
+def _enqueue_learning_logs(db: Session, rows: List[Dict[str, Any]]) -> None:
+    # Hand rows to the write-behind buffer; anything it rejects is written inline
+    if settings.LEARNING_LOG_WRITER_ENABLED:
+        rows = [row for row in rows if not learning_log_writer.submit(row)]
+    write_learning_logs(db, rows)
+
+
 def record_learning_log(
     db: Session,
     *,
@@ -45,71 +63,40 @@ def record_learning_log(
     session_id: str | None = None,
     source: str | None = None,
     commit: bool = True,
-):
-    log = LearningProgressLog(
-        user_id=user_id,
-        study_set_id=study_set_id,
-        term_id=term_id,
-        mode=mode,
-        is_correct=is_correct,
-        question_type=question_type,
-        user_answer=user_answer,
-        expected_answer=expected_answer,
-        time_spent_ms=time_spent_ms,
-        session_id=session_id,
-        source=source,
-    )
-    db.add(log)
-
-    # Update Daily Summary
-    today = datetime.now().date()
-    summary = (
-        db.query(DailyLearningSummary)
-        .filter(
-            DailyLearningSummary.user_id == user_id, DailyLearningSummary.date == today
-        )
-        .first()
-    )
-    if not summary:
-        summary = DailyLearningSummary(
-            user_id=user_id,
-            date=today,
-            total_time_ms=0,
-            total_words_reviewed=0,
-            activity_level=0,
-        )
-        db.add(summary)
-
-    # Update stats
-    if time_spent_ms:
-        summary.total_time_ms += time_spent_ms
-
-    summary.total_words_reviewed += 1
-
-    # Simple logic for activity level (0-4)
-    # Level 1: > 0 mins (Started)
-    # Level 2: > 10 mins OR > 20 words
-    # Level 3: > 30 mins OR > 50 words
-    # Level 4: > 60 mins OR > 100 words
-
-    total_mins = summary.total_time_ms / 60000
-    words = summary.total_words_reviewed
-
-    if total_mins > 60 or words > 100:
-        summary.activity_level = 4
-    elif total_mins > 30 or words > 50:
-        summary.activity_level = 3
-    elif total_mins > 10 or words > 20:
-        summary.activity_level = 2
-    else:
-        summary.activity_level = 1
-
+) -> Dict[str, Any]:
+    """
+    Record one answer log. The row is normally buffered by learning_log_writer
+    and inserted in the background, so the returned dict carries no database id.
+    """
+    row = {
+        "user_id": user_id,
+        "study_set_id": study_set_id,
+        "term_id": term_id,
+        "mode": mode,
+        "is_correct": is_correct,
+        "question_type": question_type,
+        "user_answer": user_answer,
+        "expected_answer": expected_answer,
+        "time_spent_ms": time_spent_ms,
+        "session_id": session_id,
+        "source": source,
+        "created_at": datetime.now(),
+    }
+    _enqueue_learning_logs(db, [row])
     if commit:
         db.commit()
-        db.refresh(log)
-    else:
-        db.flush()
-    return log
+    return row
+
+
+def record_learning_logs(db: Session, *, user_id: int, rows: List[Dict[str, Any]]):
+    """
+    Bulk variant of record_learning_log for a whole round of answers. Does not
+    commit.
+    """
+    now = datetime.now()
+    _enqueue_learning_logs(
+        db, [{**row, "user_id": user_id, "created_at": now} for row in rows]
+    )
 
 
 def call_active_ai(
@@ -221,114 +208,115 @@ def call_active_ai(
     return content or "未能生成报告内容。"
 
 
-@router.get("/{study_set_id}/session", response_model=LearningSession)
-def get_learning_session(
+def hours_between(db: Session, later, earlier):
+    """SQL expression for ``later - earlier`` in (fractional) hours."""
+    if db.get_bind().dialect.name == "sqlite":
+        return (func.julianday(later) - func.julianday(earlier)) * 24
+    return func.timestampdiff(text("SECOND"), earlier, later) / 3600.0
+
+
+def _clamp(value, low, high):
+    return case((value < low, low), (value > high, high), else_=value)
+
+
+def review_priority_column(db: Session, now: datetime):
+    """多维加权优先级评分（基于认知科学：间隔效应、难度自适应），在 SQL 中计算"""
+    # 1. 过期紧急度 (权重 0.35) — 超过 next_review_at 的时间越久，遗忘风险越大，优先级越高；
+    #    过期时间归一化到1周（168小时）内，还没到期的给 -0.2 使其排序靠后
+    overdue_hours = hours_between(db, now, LearningProgress.next_review_at)
+    overdue = case(
+        (LearningProgress.next_review_at.is_(None), 0.0),
+        (overdue_hours > 0, _clamp(overdue_hours / 168, 0.0, 1.0) * 0.35),
+        else_=-0.2,
+    )
+
+    # 2. 难度系数 (权重 0.25) — EF 越低，说明词越难，优先级越高；ef 的有效区间约 [1.3, 2.5]
+    ef = func.coalesce(LearningProgress.easiness_factor, 2.5)
+    difficulty = _clamp(1.0 - (ef - 1.3) / 1.2, 0.0, 1.0) * 0.25
+
+    # 3. 错误率 (权重 0.25) — 历史错误率越高的越需要复习
+    incorrect = func.coalesce(LearningProgress.total_incorrect, 0)
+    attempts = func.coalesce(LearningProgress.total_correct, 0) + incorrect
+    error_rate = incorrect * 1.0 / case((attempts > 1, attempts), else_=1) * 0.25
+
+    # 4. 时间衰减 (权重 0.15) — 距离上次复习越久，越应优先；没复习过的（如刚变成 familiar 的）给满分
+    hours_since = hours_between(db, now, LearningProgress.last_reviewed)
+    decay = case(
+        (LearningProgress.last_reviewed.is_(None), 0.15),
+        else_=case((hours_since / 168 > 1, 1.0), else_=hours_since / 168) * 0.15,
+    )
+
+    return (overdue + difficulty + error_rate + decay).label("priority")
+
+
+def _get_learning_session(
+    db: Session,
+    current_user: User,
     study_set_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
 ):
     # 1. Verify Study Set exists
-    study_set = db.query(StudySet).filter(StudySet.id == study_set_id).first()
-    if not study_set:
+    if db.query(StudySet.id).filter(StudySet.id == study_set_id).first() is None:
         raise HTTPException(status_code=404, detail="Study set not found")
 
-    # 2. Get all terms
-    terms = db.query(Term).filter(Term.study_set_id == study_set_id).all()
-    if not terms:
-        return {"new_count": 0, "familiar_count": 0, "mastered_count": 0, "terms": []}
-
-    term_map = {t.id: t for t in terms}
+    BATCH_SIZE = 7
+    # Probed through ix_learning_progress_user_term
+    progress_join = and_(
+        LearningProgress.term_id == Term.id,
+        LearningProgress.user_id == current_user.id,
+    )
 
-    # 3. Get existing progress
-    progress_records = (
-        db.query(LearningProgress)
+    # 2. Counts per bucket: one pass over the user's progress in this set
+    term_total = (
+        select(func.count(Term.id)).where(Term.study_set_id == study_set_id).scalar_subquery()
+    )
+    counts = (
+        db.query(
+            term_total.label("total"),
+            func.count(LearningProgress.id).label("started"),
+            func.coalesce(
+                func.sum(case((LearningProgress.status == LearningStatus.MASTERED, 1), else_=0)), 0
+            ).label("mastered"),
+        )
+        .select_from(LearningProgress)
+        .join(Term, progress_join)
         .filter(
             LearningProgress.user_id == current_user.id,
             LearningProgress.study_set_id == study_set_id,
+            Term.study_set_id == study_set_id,
         )
-        .all()
+        .one()
     )
-    progress_map = {p.term_id: p for p in progress_records}
-
-    # 4. Filter out mastered terms, evaluate priorities for active learning
-    now = datetime.now()
-    review_pool = []  # Terms to review (due or familiar)
-    new_pool = []  # Terms not started
-    mastered_count = 0
-
-    def _compute_priority(progress: LearningProgress) -> float:
-        """多维加权优先级评分（基于认知科学：间隔效应、难度自适应）"""
-        score = 0.0
-
-        # 1. 过期紧急度 (权重 0.35) — 超过 next_review_at 的时间越久，遗忘风险越大，优先级越高
-        if progress.next_review_at:
-            if progress.next_review_at.tzinfo is not None and now.tzinfo is None:
-                now_aware = datetime.now(progress.next_review_at.tzinfo)
-                overdue_hours = (
-                    now_aware - progress.next_review_at
-                ).total_seconds() / 3600
-            else:
-                overdue_hours = (now - progress.next_review_at).total_seconds() / 3600
-
-            # 过期时间归一化到1周（168小时）内
-            if overdue_hours > 0:
-                score += min(1.0, overdue_hours / 168) * 0.35
-            else:
-                # 还没到期，给予负分或很低分数（通常不会加入 review_pool，但这确保排序靠后）
-                score += -0.2
-
-        # 2. 难度系数 (权重 0.25) — EF 越低，说明词越难，优先级越高
-        ef = progress.easiness_factor or 2.5
-        # ef 的有效区间约 [1.3, 2.5]
-        difficulty = 1.0 - (ef - 1.3) / max(0.1, (2.5 - 1.3))
-        score += max(0, min(1, difficulty)) * 0.25
-
-        # 3. 错误率 (权重 0.25) — 历史错误率越高的越需要复习
-        total_attempts = (progress.total_correct or 0) + (progress.total_incorrect or 0)
-        error_rate = (progress.total_incorrect or 0) / max(total_attempts, 1)
-        score += float(error_rate) * 0.25
-
-        # 4. 时间衰减 (权重 0.15) — 距离上次复习越久，越应优先
-        if progress.last_reviewed:
-            if progress.last_reviewed.tzinfo is not None and now.tzinfo is None:
-                now_aware = datetime.now(progress.last_reviewed.tzinfo)
-                hours_since = (
-                    now_aware - progress.last_reviewed
-                ).total_seconds() / 3600
-            else:
-                hours_since = (now - progress.last_reviewed).total_seconds() / 3600
-            score += min(1.0, hours_since / 168) * 0.15
-        else:
-            score += 0.15  # 没复习过的（如刚变成 familiar 的）
-
-        return round(score, 4)
+    if not counts.total:
+        return {"new_count": 0, "familiar_count": 0, "mastered_count": 0, "terms": []}
 
-    for term in terms:
-        progress = progress_map.get(term.id)
-        if progress:
-            if progress.status == LearningStatus.MASTERED:
-                mastered_count += 1
-            else:
-                priority = _compute_priority(progress)
-                review_pool.append(
-                    {
-                        "term": term,
-                        "priority": priority,
-                        "status": progress.status,
-                        "consecutive": progress.consecutive_correct or 0,
-                    }
-                )
-        else:
-            new_pool.append(term)
+    # 3. Only the candidates a batch can use: the top review terms by priority
+    #    and the first unstarted terms (anti-join on progress)
+    priority = review_priority_column(db, datetime.now())
+    review_pool = (
+        db.query(Term, LearningProgress.status, LearningProgress.consecutive_correct, priority)
+        .join(LearningProgress, progress_join)
+        .filter(
+            Term.study_set_id == study_set_id,
+            LearningProgress.study_set_id == study_set_id,
+            LearningProgress.status != LearningStatus.MASTERED,
+        )
+        .order_by(priority.desc(), Term.id)
+        .limit(BATCH_SIZE)
+        .all()
+    )
+    new_pool = (
+        db.query(Term)
+        .outerjoin(LearningProgress, progress_join)
+        .filter(Term.study_set_id == study_set_id, LearningProgress.id.is_(None))
+        .order_by(Term.id)
+        .limit(BATCH_SIZE)
+        .all()
+    )
 
-    # 5. Build Final Session Batch (Target 7 terms)
-    BATCH_SIZE = 7
+    # 4. Build Final Session Batch (Target 7 terms)
     session_terms = []
 
-    # 5.1 Sort review pool by descending priority
-    review_pool.sort(key=lambda x: x["priority"], reverse=True)
-
-    # 5.2 Interleave Review and New Terms
+    # 4.1 Interleave Review and New Terms
     # Ratio: roughly 2 review : 1 new (if available) for interleaved practice chunking
     # This prevents cognitive overload from purely new material, and avoids boredom from purely review.
 
@@ -353,30 +341,34 @@ def get_learning_session(
             )
             session_terms.append(t_dict)
         elif r_idx < len(review_pool):
-            review_item = review_pool[r_idx]
+            term, learning_status, consecutive, score = review_pool[r_idx]
             r_idx += 1
-            term = review_item["term"]
             t_dict = TermResponse.model_validate(term).model_dump()
-            t_dict["learning_status"] = review_item["status"]
-            t_dict["consecutive_correct"] = review_item["consecutive"]
-            t_dict["priority_score"] = review_item["priority"]
+            t_dict["learning_status"] = learning_status
+            t_dict["consecutive_correct"] = consecutive or 0
+            t_dict["priority_score"] = round(float(score), 4)
             session_terms.append(t_dict)
         else:
             # Fallback (shouldn't really hit this due to while conditions but safe guard)
             break
 
-    # For extra difficulty randomization, gently shuffle top-N to prevent predictable order?
-    # Not strictly necessary if priority is precise, but small jitter might help.
-    # Skipping jitter for now as score itself works as a decent entropy if weights differ.
-
     return {
-        "new_count": len(new_pool),
-        "familiar_count": len(review_pool),
-        "mastered_count": mastered_count,
+        "new_count": counts.total - counts.started,
+        "familiar_count": counts.started - int(counts.mastered),
+        "mastered_count": int(counts.mastered),
         "terms": session_terms,
     }
 
 
+@router.get("/{study_set_id}/session", response_model=LearningSession)
+async def get_learning_session(
+    study_set_id: int,
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
+):
+    return await db.run_sync(_get_learning_session, current_user, study_set_id)
+
+
 def _sm2_schedule(progress: LearningProgress, is_correct: bool) -> None:
     """
     Apply SM-2 spaced repetition algorithm to update review scheduling.
@@ -421,45 +413,11 @@ def _sm2_schedule(progress: LearningProgress, is_correct: bool) -> None:
     progress.next_review_at = now + timedelta(days=interval)
 
 
-@router.post(
-    "/{study_set_id}/update/{term_id}", response_model=LearningProgressResponse
-)
-def update_progress(
-    study_set_id: int,
-    term_id: int,
-    payload: LearningProgressUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
-):
-    # Get or create progress record
-    progress = (
-        db.query(LearningProgress)
-        .filter(
-            LearningProgress.user_id == current_user.id,
-            LearningProgress.term_id == term_id,
-        )
-        .first()
-    )
-
-    if not progress:
-        progress = LearningProgress(
-            user_id=current_user.id,
-            study_set_id=study_set_id,
-            term_id=term_id,
-            status=LearningStatus.NOT_STARTED,
-            consecutive_correct=0,
-            total_correct=0,
-            total_incorrect=0,
-            easiness_factor=2.5,
-            review_interval_days=0,
-            review_count=0,
-        )
-        db.add(progress)
-
-    # Update status logic
+def _apply_answer(progress: LearningProgress, is_correct: bool) -> None:
+    """Advance the learning status of a progress record and reschedule it via SM-2."""
     current_status = progress.status
 
-    if payload.is_correct:
+    if is_correct:
         if current_status == LearningStatus.NOT_STARTED:
             progress.status = LearningStatus.FAMILIAR
             progress.consecutive_correct = 1
@@ -489,7 +447,61 @@ def update_progress(
         progress.mastered_at = progress.last_reviewed
 
     # Apply SM-2 SRS scheduling
-    _sm2_schedule(progress, payload.is_correct)
+    _sm2_schedule(progress, is_correct)
+
+
+def _new_progress(user_id: int, study_set_id: int, term_id: int) -> LearningProgress:
+    return LearningProgress(
+        user_id=user_id,
+        study_set_id=study_set_id,
+        term_id=term_id,
+        status=LearningStatus.NOT_STARTED,
+        consecutive_correct=0,
+        total_correct=0,
+        total_incorrect=0,
+        easiness_factor=2.5,
+        review_interval_days=0,
+        review_count=0,
+    )
+
+
+def _update_progress(
+    db: Session,
+    current_user: User,
+    study_set_id: int,
+    term_id: int,
+    payload: LearningProgressUpdate,
+):
+    # Get or create progress record. The row is locked until commit so a
+    # concurrent answer can't apply the same status change to the counters twice
+    progress = (
+        db.query(LearningProgress)
+        .filter(
+            LearningProgress.user_id == current_user.id,
+            LearningProgress.term_id == term_id,
+        )
+        .with_for_update()
+        .first()
+    )
+
+    previous_status = progress.status if progress else None
+    if not progress:
+        progress = _new_progress(current_user.id, study_set_id, term_id)
+        db.add(progress)
+
+    _apply_answer(progress, payload.is_correct)
+    bump_set_stats(
+        db,
+        [
+            status_change(
+                current_user.id,
+                progress.study_set_id,
+                previous_status,
+                progress.status,
+                progress.last_reviewed,
+            )
+        ],
+    )
 
     record_learning_log(
         db,
@@ -508,20 +520,155 @@ def update_progress(
     )
 
     db.commit()
+    daily_plan_cache.pop(current_user.id)
     db.refresh(progress)
-    return progress
+    return LearningProgressResponse.model_validate(progress)
 
 
-@router.get("/review-queue")
-def get_review_queue(
-    limit: int = 50,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+@router.post(
+    "/{study_set_id}/update/{term_id}", response_model=LearningProgressResponse
+)
+async def update_progress(
+    study_set_id: int,
+    term_id: int,
+    payload: LearningProgressUpdate,
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
+):
+    return await db.run_sync(_update_progress, current_user, study_set_id, term_id, payload)
+
+
+def _batch_update_progress(
+    db: Session,
+    current_user: User,
+    study_set_id: int,
+    payload: LearningProgressBatchUpdate,
+):
+    term_ids = {answer.term_id for answer in payload.answers}
+
+    # Validate that every term belongs to this study set to avoid orphaned logs
+    found_ids = {
+        tid
+        for (tid,) in db.query(Term.id).filter(
+            Term.study_set_id == study_set_id, Term.id.in_(term_ids)
+        )
+    }
+    missing = term_ids - found_ids
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Term not found in study set: {sorted(missing)}",
+        )
+
+    def load_progress() -> Dict[int, LearningProgress]:
+        # Locked until commit, in term order so concurrent batches can't
+        # deadlock, so the status changes applied to the counters stay exact
+        progress_map: Dict[int, LearningProgress] = {}
+        for progress in (
+            db.query(LearningProgress)
+            .filter(
+                LearningProgress.user_id == current_user.id,
+                LearningProgress.term_id.in_(term_ids),
+            )
+            .order_by(LearningProgress.term_id, LearningProgress.id)
+            .with_for_update()
+        ):
+            progress_map.setdefault(progress.term_id, progress)
+        return progress_map
+
+    progress_map = load_progress()
+    previous_status = {term_id: progress.status for term_id, progress in progress_map.items()}
+
+    # Create missing progress rows with one multi-row INSERT, then re-read them
+    missing_progress = term_ids - progress_map.keys()
+    if missing_progress:
+        db.execute(
+            insert(LearningProgress.__table__),
+            [
+                {
+                    "user_id": current_user.id,
+                    "study_set_id": study_set_id,
+                    "term_id": term_id,
+                    "status": LearningStatus.NOT_STARTED,
+                    "consecutive_correct": 0,
+                    "total_correct": 0,
+                    "total_incorrect": 0,
+                    "easiness_factor": 2.5,
+                    "review_interval_days": 0,
+                    "review_count": 0,
+                }
+                for term_id in missing_progress
+            ],
+        )
+        progress_map = load_progress()
+
+    log_rows = []
+    for answer in payload.answers:
+        progress = progress_map[answer.term_id]
+        _apply_answer(progress, answer.is_correct)
+
+        log_rows.append(
+            {
+                "study_set_id": study_set_id,
+                "term_id": answer.term_id,
+                "mode": "learn",
+                "is_correct": answer.is_correct,
+                "question_type": answer.question_type,
+                "user_answer": answer.user_answer,
+                "expected_answer": answer.expected_answer,
+                "time_spent_ms": answer.time_spent_ms,
+                "session_id": answer.session_id,
+                "source": answer.source or "learn_mode",
+            }
+        )
+
+    record_learning_logs(db, user_id=current_user.id, rows=log_rows)
+    bump_set_stats(
+        db,
+        [
+            status_change(
+                current_user.id,
+                progress_map[term_id].study_set_id,
+                previous_status.get(term_id),
+                progress_map[term_id].status,
+                progress_map[term_id].last_reviewed,
+            )
+            for term_id in term_ids
+        ],
+    )
+
+    # Serialize before commit so expired attributes are not reloaded row by row
+    response = [
+        LearningProgressResponse.model_validate(progress_map[term_id])
+        for term_id in dict.fromkeys(answer.term_id for answer in payload.answers)
+    ]
+    db.commit()
+    daily_plan_cache.pop(current_user.id)
+    return response
+
+
+@router.post(
+    "/{study_set_id}/batch-update", response_model=List[LearningProgressResponse]
+)
+async def batch_update_progress(
+    study_set_id: int,
+    payload: LearningProgressBatchUpdate,
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
 ):
     """
-    获取今日待复习队列：next_review_at <= now 的所有词汇，
-    按紧急程度排序（过期最久的优先）。
+    批量提交一轮答题结果（通常是 get_learning_session 返回的 7 个词）。
+    语义与逐条调用 update_progress 相同，但在一个事务内完成：
+    一次校验词条、一次读取进度、多行插入日志、一次更新每日汇总。
     """
+    return await db.run_sync(_batch_update_progress, current_user, study_set_id, payload)
+
+
+def _get_review_queue(
+    db: Session,
+    current_user: User,
+    limit: int = 50,
+):
     now = datetime.now()
 
     due_items = (
@@ -586,64 +733,77 @@ def get_review_queue(
     }
 
 
-@router.get("/daily-plan")
-def get_daily_plan(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+@router.get("/review-queue")
+async def get_review_queue(
+    limit: int = 50,
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
 ):
     """
-    获取今日学习计划摘要：
-    - 待复习: next_review_at <= now 的词汇数
-    - 需巩固: status = familiar 且无 next_review_at 的词汇数
-    - 新学习: status = not_started 的词汇数（来自用户拥有的学习集）
-    - 预估时间(分钟)
+    获取今日待复习队列：next_review_at <= now 的所有词汇，
+    按紧急程度排序（过期最久的优先）。
     """
+    return await db.run_sync(_get_review_queue, current_user, limit)
+
+
+# Per-user daily plan; dropped when the user answers or resets progress and
+# otherwise recomputed once the TTL expires
+daily_plan_cache = TTLCache(maxsize=10000, ttl=settings.DAILY_PLAN_CACHE_TTL_SECONDS)
+
+
+def _get_daily_plan(
+    db: Session,
+    current_user: User,
+):
+    cached = daily_plan_cache.get(current_user.id)
+    if cached is not None:
+        return cached
+
     now = datetime.now()
+    user_progress = LearningProgress.user_id == current_user.id
 
-    # Count due reviews
+    # Due reviews, counted from ix_learning_progress_user_due
     review_count = (
-        db.query(LearningProgress)
-        .filter(
-            LearningProgress.user_id == current_user.id,
+        select(func.count())
+        .select_from(LearningProgress)
+        .where(
+            user_progress,
             LearningProgress.next_review_at.isnot(None),
             LearningProgress.next_review_at <= now,
         )
-        .count()
+        .scalar_subquery()
     )
 
-    # Count familiar but not yet scheduled (legacy data)
+    # Familiar but not yet scheduled (legacy data)
     consolidate_count = (
-        db.query(LearningProgress)
-        .filter(
-            LearningProgress.user_id == current_user.id,
+        select(func.count())
+        .select_from(LearningProgress)
+        .where(
+            user_progress,
             LearningProgress.status == LearningStatus.FAMILIAR,
             LearningProgress.next_review_at.is_(None),
         )
-        .count()
+        .scalar_subquery()
     )
 
-    # Count new terms (not_started) across user's study sets
-    user_set_ids = (
-        db.query(StudySet.id).filter(StudySet.author_id == current_user.id).all()
+    # Terms of the user's own sets without any progress (anti-join)
+    new_count = (
+        select(func.count(Term.id))
+        .select_from(Term)
+        .join(StudySet, and_(StudySet.id == Term.study_set_id, StudySet.author_id == current_user.id))
+        .outerjoin(LearningProgress, and_(user_progress, LearningProgress.term_id == Term.id))
+        .where(LearningProgress.id.is_(None))
+        .scalar_subquery()
     )
-    user_set_ids = [s[0] for s in user_set_ids]
-
-    new_count = 0
-    if user_set_ids:
-        # Terms user hasn't started yet
-        started_term_ids = (
-            db.query(LearningProgress.term_id)
-            .filter(LearningProgress.user_id == current_user.id)
-            .subquery()
-        )
-        new_count = (
-            db.query(Term)
-            .filter(
-                Term.study_set_id.in_(user_set_ids),
-                ~Term.id.in_(started_term_ids),
-            )
-            .count()
+
+    counts = db.execute(
+        select(
+            review_count.label("review_count"),
+            consolidate_count.label("consolidate_count"),
+            new_count.label("new_count"),
         )
+    ).one()
+    review_count, consolidate_count, new_count = counts
 
     # Suggest max 10 new terms per day
     suggested_new = min(new_count, 10)
@@ -654,7 +814,7 @@ def get_daily_plan(
         1, round((review_count * 30 + consolidate_count * 30 + suggested_new * 60) / 60)
     )
 
-    return {
+    plan = {
         "review_count": review_count,
         "consolidate_count": consolidate_count,
         "new_count": new_count,
@@ -662,6 +822,23 @@ def get_daily_plan(
         "total_items": total_items,
         "estimated_minutes": estimated_minutes,
     }
+    daily_plan_cache.set(current_user.id, plan)
+    return plan
+
+
+@router.get("/daily-plan")
+async def get_daily_plan(
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
+):
+    """
+    获取今日学习计划摘要：
+    - 待复习: next_review_at <= now 的词汇数
+    - 需巩固: status = familiar 且无 next_review_at 的词汇数
+    - 新学习: status = not_started 的词汇数（来自用户拥有的学习集）
+    - 预估时间(分钟)
+    """
+    return await db.run_sync(_get_daily_plan, current_user)
 
 
 @router.get("/weak-terms")
@@ -674,52 +851,49 @@ def get_weak_terms(
     薄弱项智能识别：分析用户答题日志，找出高错误率 + 长时间未复习的词汇。
     返回按"薄弱程度"排序的词汇列表，每个词附带错误率、上次复习时间、学习集信息。
     """
-    from sqlalchemy import func, case
-
-    # Step 1: Aggregate error stats per term from logs (last 500 logs)
-    term_stats_q = (
-        db.query(
-            LearningProgressLog.term_id,
-            LearningProgressLog.study_set_id,
-            func.count(LearningProgressLog.id).label("total_attempts"),
-            func.sum(case((LearningProgressLog.is_correct == False, 1), else_=0)).label(
-                "error_count"
-            ),
-        )
-        .filter(LearningProgressLog.user_id == current_user.id)
-        .group_by(LearningProgressLog.term_id, LearningProgressLog.study_set_id)
-        .having(func.count(LearningProgressLog.id) >= 2)  # At least 2 attempts
-        .subquery()
+    # Step 1: Score each term with >= 2 attempts by weakness in SQL and keep the top `limit`
+    # Weakness score = error_rate * 0.6 + time_decay * 0.4
+    now = datetime.now()
+    error_rate = LearningTermStats.errors * 1.0 / LearningTermStats.attempts
+    # Hours since last review (longer = weaker memory), normalized to 1 week; never reviewed → 1
+    decay_hours = hours_between(db, now, LearningProgress.last_reviewed) / 168
+    time_decay = case(
+        (LearningProgress.last_reviewed.is_(None), 1.0),
+        (decay_hours > 1, 1.0),
+        else_=decay_hours,
     )
-
-    # Step 2: Join with LearningProgress for review timing
+    weakness = (error_rate * 0.6 + time_decay * 0.4).label("weakness_score")
     results = (
         db.query(
-            term_stats_q.c.term_id,
-            term_stats_q.c.study_set_id,
-            term_stats_q.c.total_attempts,
-            term_stats_q.c.error_count,
+            LearningTermStats.term_id,
+            LearningTermStats.study_set_id,
+            LearningTermStats.attempts.label("total_attempts"),
+            LearningTermStats.errors.label("error_count"),
             LearningProgress.status,
             LearningProgress.last_reviewed,
-            LearningProgress.easiness_factor,
+            weakness,
         )
         .outerjoin(
             LearningProgress,
-            (LearningProgress.term_id == term_stats_q.c.term_id)
+            (LearningProgress.term_id == LearningTermStats.term_id)
             & (LearningProgress.user_id == current_user.id),
         )
+        .filter(
+            LearningTermStats.user_id == current_user.id,
+            LearningTermStats.attempts >= 2,  # At least 2 attempts
+        )
+        .order_by(weakness.desc(), LearningTermStats.term_id)
+        .limit(limit)
         .all()
     )
 
     if not results:
         return {"total": 0, "items": []}
 
-    # Step 3: Score each term by weakness
-    now = datetime.now()
-    scored = []
+    # Step 2: Format the top terms
+    top = []
     for row in results:
         error_rate = (row.error_count or 0) / max(row.total_attempts, 1)
-        # Hours since last review (longer = weaker memory)
         # Handle potential timezone mismatch
         row_lr = row.last_reviewed
         if row_lr:
@@ -732,13 +906,7 @@ def get_weak_terms(
         else:
             hours_since = 999  # Never reviewed → very weak
 
-        # Weakness score = error_rate * 0.6 + time_decay * 0.4
-        time_decay = float(min(1.0, hours_since / 168))  # Normalize to 1 week
-        # Ensure error_rate is float (can be Decimal from DB sum)
-        error_rate_f = float(error_rate)
-        weakness_score = error_rate_f * 0.6 + time_decay * 0.4
-
-        scored.append(
+        top.append(
             {
                 "term_id": row.term_id,
                 "study_set_id": row.study_set_id,
@@ -750,14 +918,10 @@ def get_weak_terms(
                     row.last_reviewed.isoformat() if row.last_reviewed else None
                 ),
                 "hours_since_review": round(hours_since, 1),
-                "weakness_score": round(weakness_score, 3),
+                "weakness_score": round(float(row.weakness_score), 3),
             }
         )
 
-    # Sort by weakness score descending
-    scored.sort(key=lambda x: x["weakness_score"], reverse=True)
-    top = scored[:limit]
-
     # Enrich with term text and study set title
     term_ids = [t["term_id"] for t in top]
     set_ids = list({t["study_set_id"] for t in top})
@@ -778,6 +942,54 @@ def get_weak_terms(
     return {"total": len(top), "items": top}
 
 
+def _term_counts(db: Session, study_set_ids) -> Dict[int, int]:
+    """Term count per study set with one grouped COUNT; sets without terms are absent."""
+    if not study_set_ids:
+        return {}
+    return dict(
+        db.query(Term.study_set_id, func.count(Term.id))
+        .filter(Term.study_set_id.in_(study_set_ids))
+        .group_by(Term.study_set_id)
+        .all()
+    )
+
+
+def _popular_item(s, term_count: int) -> Dict[str, Any]:
+    return {
+        "study_set_id": s.id,
+        "title": s.title,
+        "description": s.description,
+        "author_id": s.author_id,
+        "term_count": term_count,
+        "mastery_percentage": 0,
+        "view_count": s.view_count,
+        "reason": "popular",
+    }
+
+
+def _query_popular_sets(db: Session, limit: int, exclude_author_id: int | None = None, exclude_ids=()):
+    query = db.query(
+        StudySet.id,
+        StudySet.title,
+        StudySet.description,
+        StudySet.author_id,
+        StudySet.view_count,
+    ).filter(StudySet.is_public.is_(True))
+    if exclude_author_id is not None:
+        query = query.filter(StudySet.author_id != exclude_author_id)
+    if exclude_ids:
+        query = query.filter(~StudySet.id.in_(exclude_ids))
+    sets = query.order_by(StudySet.view_count.desc(), StudySet.id).limit(limit).all()
+    term_counts = _term_counts(db, [s.id for s in sets])
+    return [_popular_item(s, term_counts.get(s.id, 0)) for s in sets]
+
+
+# Most viewed public sets shared by every user's recommendations, cleared with
+# the public leaderboard; each request drops its own and already-recommended sets
+POPULAR_POOL_SIZE = 50
+popular_sets_cache = TTLCache(maxsize=1, ttl=settings.TOP_SETS_CACHE_TTL_SECONDS)
+
+
 @router.get("/smart-recommend")
 def get_smart_recommend(
     limit: int = 6,
@@ -790,123 +1002,107 @@ def get_smart_recommend(
     1. needs_work: 掌握度最低的已开始学习集（优先攻克）
     2. not_started: 用户拥有但尚未开始的学习集（新目标）
     3. popular: 热门公开学习集（探索发现）
+    查询次数固定，与用户的学习集数量和词汇量无关。
     """
-    from sqlalchemy import func, case
-
     # --- 1. Needs Work: Study sets with lowest mastery percentage ---
-    # Get user's progress grouped by study_set
-    progress_stats = (
+    # Ranked in SQL from the maintained per-set counters
+    total = (
+        LearningSetStats.not_started
+        + LearningSetStats.familiar
+        + LearningSetStats.mastered
+    )
+    total_or_one = case((total > 0, total), else_=1)
+    nw_rows = (
         db.query(
-            LearningProgress.study_set_id,
-            func.count(LearningProgress.id).label("total"),
-            func.sum(
-                case((LearningProgress.status == LearningStatus.MASTERED, 1), else_=0)
-            ).label("mastered"),
+            LearningSetStats.study_set_id,
+            total.label("total"),
+            LearningSetStats.mastered,
+            StudySet.id.label("found_id"),
+            StudySet.title,
+            StudySet.description,
+            StudySet.author_id,
+        )
+        .outerjoin(StudySet, StudySet.id == LearningSetStats.study_set_id)
+        .filter(
+            LearningSetStats.user_id == current_user.id,
+            LearningSetStats.mastered < total_or_one,  # Not fully mastered
         )
-        .filter(LearningProgress.user_id == current_user.id)
-        .group_by(LearningProgress.study_set_id)
+        .order_by(LearningSetStats.mastered * 1.0 / total_or_one, LearningSetStats.study_set_id)
+        .limit(limit)
         .all()
     )
 
-    needs_work = []
-    for stat in progress_stats:
-        mastered = stat.mastered or 0
-        total = stat.total or 1
-        mastery_pct = (mastered / total) * 100
-        if mastery_pct < 100:  # Not fully mastered
-            needs_work.append(
-                {
-                    "study_set_id": stat.study_set_id,
-                    "mastery_percentage": round(mastery_pct, 1),
-                    "mastered_count": mastered,
-                    "total_terms": total,
-                }
-            )
-
-    needs_work.sort(key=lambda x: x["mastery_percentage"])
-    needs_work = needs_work[:limit]
+    # --- 2. Not Started: User's own sets with terms but no progress ---
+    started = select(LearningSetStats.study_set_id).where(
+        LearningSetStats.user_id == current_user.id,
+        LearningSetStats.study_set_id == StudySet.id,
+        total > 0,
+    )
+    has_terms = select(Term.id).where(Term.study_set_id == StudySet.id)
+    ns_rows = (
+        db.query(StudySet.id, StudySet.title, StudySet.description, StudySet.author_id)
+        .filter(
+            StudySet.author_id == current_user.id,
+            ~started.exists(),
+            has_terms.exists(),
+        )
+        .order_by(StudySet.id)
+        .limit(limit)
+        .all()
+    )
 
-    # Enrich with study set info
-    nw_set_ids = [n["study_set_id"] for n in needs_work]
-    nw_sets = (
-        db.query(StudySet).filter(StudySet.id.in_(nw_set_ids)).all()
-        if nw_set_ids
-        else []
+    term_counts = _term_counts(
+        db, [row.study_set_id for row in nw_rows] + [row.id for row in ns_rows]
     )
-    nw_set_map = {s.id: s for s in nw_sets}
-    for item in needs_work:
-        s = nw_set_map.get(item["study_set_id"])
-        if s:
-            item["title"] = s.title
-            item["description"] = s.description
-            item["author_id"] = s.author_id
-            item["term_count"] = len(s.terms) if s.terms else item["total_terms"]
+
+    needs_work = []
+    for row in nw_rows:
+        mastered = row.mastered or 0
+        total_terms = row.total or 1
+        item = {
+            "study_set_id": row.study_set_id,
+            "mastery_percentage": round((mastered / total_terms) * 100, 1),
+            "mastered_count": mastered,
+            "total_terms": total_terms,
+        }
+        if row.found_id is not None:
+            item["title"] = row.title
+            item["description"] = row.description
+            item["author_id"] = row.author_id
+            item["term_count"] = term_counts.get(row.study_set_id) or total_terms
         else:
             item["title"] = "未知学习集"
             item["description"] = ""
         item["reason"] = "needs_work"
-
-    # --- 2. Not Started: User's own sets with no progress ---
-    user_sets = db.query(StudySet).filter(StudySet.author_id == current_user.id).all()
-    started_set_ids = {
-        p.study_set_id
-        for p in db.query(LearningProgress.study_set_id)
-        .filter(LearningProgress.user_id == current_user.id)
-        .distinct()
-        .all()
-    }
-    # Also include sets with 0 terms in progress (i.e. not in started_set_ids)
-    started_set_ids = {
-        sid
-        for (sid,) in db.query(LearningProgress.study_set_id)
-        .filter(LearningProgress.user_id == current_user.id)
-        .distinct()
-        .all()
-    }
-
-    not_started = []
-    for s in user_sets:
-        if s.id not in started_set_ids and s.terms:
-            not_started.append(
-                {
-                    "study_set_id": s.id,
-                    "title": s.title,
-                    "description": s.description,
-                    "author_id": s.author_id,
-                    "term_count": len(s.terms),
-                    "mastery_percentage": 0,
-                    "reason": "not_started",
-                }
-            )
-    not_started = not_started[:limit]
+        needs_work.append(item)
+
+    not_started = [
+        {
+            "study_set_id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "author_id": row.author_id,
+            "term_count": term_counts.get(row.id, 0),
+            "mastery_percentage": 0,
+            "reason": "not_started",
+        }
+        for row in ns_rows
+    ]
 
     # --- 3. Popular: public sets not owned by user (fallback) ---
-    popular = []
-    exclude_ids = set(nw_set_ids) | {s["study_set_id"] for s in not_started}
-    pop_sets = (
-        db.query(StudySet)
-        .filter(
-            StudySet.is_public == True,
-            StudySet.author_id != current_user.id,
-            ~StudySet.id.in_(exclude_ids) if exclude_ids else True,
-        )
-        .order_by(StudySet.view_count.desc())
-        .limit(limit)
-        .all()
-    )
-    for s in pop_sets:
-        popular.append(
-            {
-                "study_set_id": s.id,
-                "title": s.title,
-                "description": s.description,
-                "author_id": s.author_id,
-                "term_count": len(s.terms) if s.terms else 0,
-                "mastery_percentage": 0,
-                "view_count": s.view_count,
-                "reason": "popular",
-            }
-        )
+    exclude_ids = {item["study_set_id"] for item in needs_work + not_started}
+    pool = popular_sets_cache.get("popular")
+    if pool is None:
+        pool = _query_popular_sets(db, POPULAR_POOL_SIZE)
+        popular_sets_cache.set("popular", pool)
+    popular = [
+        item
+        for item in pool
+        if item["author_id"] != current_user.id and item["study_set_id"] not in exclude_ids
+    ][:limit]
+    if len(popular) < limit and len(pool) == POPULAR_POOL_SIZE:
+        # The shared pool ran out after filtering; ask the database directly
+        popular = _query_popular_sets(db, limit, current_user.id, exclude_ids)
 
     return {
         "needs_work": needs_work,
@@ -915,12 +1111,11 @@ def get_smart_recommend(
     }
 
 
-@router.post("/{study_set_id}/log", response_model=LearningProgressLogResponse)
-def create_progress_log(
+def _create_progress_log(
+    db: Session,
+    current_user: User,
     study_set_id: int,
     payload: LearningProgressLogCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
 ):
     # Validate that term belongs to this study set to avoid orphaned logs
     term = (
@@ -948,6 +1143,16 @@ def create_progress_log(
     return log
 
 
+@router.post("/{study_set_id}/log", response_model=LearningProgressLogResponse)
+async def create_progress_log(
+    study_set_id: int,
+    payload: LearningProgressLogCreate,
+    db: AsyncDB = Depends(get_async_db),
+    current_user: User = Depends(deps.get_async_current_user),
+):
+    return await db.run_sync(_create_progress_log, current_user, study_set_id, payload)
+
+
 @router.post("/{study_set_id}/reset", status_code=200)
 def reset_progress(
     study_set_id: int,
@@ -963,11 +1168,85 @@ def reset_progress(
         LearningProgress.user_id == current_user.id,
         LearningProgress.study_set_id == study_set_id,
     ).delete()
+    rebuild_set_stats(db, user_id=current_user.id, study_set_id=study_set_id)
 
     db.commit()
+    daily_plan_cache.pop(current_user.id)
     return {"message": "Progress reset successfully"}
 
 
+def _check_can_export_logs(db: Session, current_user: User, user_id: int) -> None:
+    # Users export their own history; teachers also their class members', admins anyone's
+    if user_id == current_user.id or current_user.role == "admin":
+        return
+    if current_user.role == "teacher":
+        in_class = (
+            db.query(class_members.c.user_id)
+            .join(StudyGroup, StudyGroup.id == class_members.c.study_group_id)
+            .filter(
+                StudyGroup.teacher_id == current_user.id,
+                class_members.c.user_id == user_id,
+            )
+            .first()
+        )
+        if in_class:
+            return
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authorized to export this user's history",
+    )
+
+
+@router.get("/logs/export")
+def export_learning_logs(
+    format: ExportFormat = "csv",
+    user_id: int | None = None,
+    study_set_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Stream answer history (learning_progress_logs) oldest first as CSV or
+    NDJSON. Defaults to the current user; teachers may pass a student's
+    user_id from one of their classes.
+    """
+    user_id = user_id or current_user.id
+    _check_can_export_logs(db, current_user, user_id)
+
+    statement = (
+        select(
+            LearningProgressLog.created_at,
+            LearningProgressLog.user_id,
+            LearningProgressLog.study_set_id,
+            StudySet.title.label("study_set_title"),
+            LearningProgressLog.term_id,
+            Term.term,
+            LearningProgressLog.mode,
+            LearningProgressLog.question_type,
+            LearningProgressLog.is_correct,
+            LearningProgressLog.user_answer,
+            LearningProgressLog.expected_answer,
+            LearningProgressLog.time_spent_ms,
+            LearningProgressLog.session_id,
+            LearningProgressLog.source,
+        )
+        .outerjoin(StudySet, StudySet.id == LearningProgressLog.study_set_id)
+        .outerjoin(Term, Term.id == LearningProgressLog.term_id)
+        .where(LearningProgressLog.user_id == user_id)
+        .order_by(LearningProgressLog.created_at, LearningProgressLog.id)
+    )
+    if study_set_id is not None:
+        statement = statement.where(LearningProgressLog.study_set_id == study_set_id)
+    if start is not None:
+        statement = statement.where(LearningProgressLog.created_at >= start)
+    if end is not None:
+        statement = statement.where(LearningProgressLog.created_at < end)
+
+    return export_response(statement, format, f"learning-history-{user_id}")
+
+
 def _timeframe_window(timeframe: str) -> datetime | None:
     mapping = {
         "本周": 7,
@@ -1007,6 +1286,8 @@ def generate_learning_report(
     # per-term aggregates
     term_stats: Dict[int, Dict[str, Any]] = {}
     for log in logs:
+        if log.term_id is None:
+            continue  # Term was removed from its set; still counted above
         stats = term_stats.setdefault(
             log.term_id, {"total": 0, "incorrect": 0, "question_types": {}}
         )
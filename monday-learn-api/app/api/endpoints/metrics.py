@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends
+
+from app.api.endpoints.ai_configs import check_admin
+from app.api.endpoints.learning import daily_plan_cache, popular_sets_cache
+from app.api.endpoints.study_sets import study_set_payload_cache, top_sets_cache
+from app.core.deps import get_current_user, user_cache
+from app.db.learning_logs import learning_log_writer
+from app.db.search import search_index_writer
+from app.db.session import async_engine, engine
+from app.db.study_set_views import recent_touches, study_set_view_writer
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/learning-log-writer")
+def get_learning_log_writer_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Queue depth and flush latency of the answer-log write-behind buffer."""
+    check_admin(current_user)
+    return learning_log_writer.stats()
+
+
+@router.get("/study-set-views")
+def get_study_set_view_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Queue depth and flush latency of the buffered view counter."""
+    check_admin(current_user)
+    return {
+        "writer": study_set_view_writer.stats(),
+        "recent_touches": recent_touches.stats(),
+        "top_sets_cache": top_sets_cache.stats(),
+        "popular_sets_cache": popular_sets_cache.stats(),
+        "payload_cache": study_set_payload_cache.stats(),
+    }
+
+
+@router.get("/search-index-writer")
+def get_search_index_writer_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Queue depth and flush latency of the background search reindexer."""
+    check_admin(current_user)
+    return search_index_writer.stats()
+
+
+@router.get("/daily-plan-cache")
+def get_daily_plan_cache_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Hit/miss counters of the per-user daily plan cache."""
+    check_admin(current_user)
+    return daily_plan_cache.stats()
+
+
+@router.get("/user-cache")
+def get_user_cache_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Hit/miss counters of the authenticated user cache."""
+    check_admin(current_user)
+    return user_cache.stats()
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Checked-out/overflow connections and checkout wait of the DB pools."""
+    check_admin(current_user)
+    pools = {"sync": engine.pool.stats()}
+    if async_engine is not None:
+        pools["async"] = async_engine.pool.stats()
+    return pools
@@ -1,22 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload, selectinload
 from datetime import datetime
+import base64
+import csv
+import hashlib
+import heapq
+import io
+import itertools
 import json
 import re
-from typing import List, Union
-from app.core.deps import get_current_user
+from collections import defaultdict, deque
+from typing import Dict, List, Tuple, Union
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.deps import get_async_current_user, get_current_user
 from app.core.logger import logger
-from app.db.session import get_db
+from app.db.export import ExportFormat, export_response
+from app.db.learning_stats import rebuild_set_stats
+from app.db.search import reindex_study_sets, search_public_study_set_ids
+from app.db.session import AsyncDB, get_async_db, get_db
+from app.db.study_set_views import record_view
 from app.models.study_set import StudySet, Term
+from app.models.learning_set_stats import LearningSetStats
+from app.models.learning_term_stats import LearningTermStats
+from app.models.study_set_search_doc import StudySetSearchDoc
 from app.schemas.study_set import (
     StudySetCreate,
     StudySetResponse,
     StudySetUpdate,
     TermResponse,
     StudySetCloneRequest,
+    StudySetFields,
+    StudySetPage,
+    TermImportDelimiter,
+    TermImportError,
+    TermImportResult,
+    TermUpdate,
 )
 from app.schemas.ai_exam import ExamPaper
-from app.api.endpoints.learning import call_active_ai
+from app.api.endpoints.learning import call_active_ai, daily_plan_cache, popular_sets_cache
 
 
 router = APIRouter()
@@ -24,7 +47,7 @@ router = APIRouter()
 
 from app.models.learning_progress import LearningProgress, LearningStatus
 from app.models.learning_progress_log import LearningProgressLog
-from sqlalchemy import func, case, cast, Integer
+from sqlalchemy import and_, delete, func, case, cast, insert, literal, or_, select, type_coerce, update, Integer, String
 
 def build_fallback_exam(study_set: StudySet, terms: List[Term]) -> ExamPaper:
     # Deterministic fallback to avoid blocking users when AI JSON解析失败
@@ -88,39 +111,81 @@ def build_fallback_exam(study_set: StudySet, terms: List[Term]) -> ExamPaper:
         ],
     )
 
-def serialize_study_set(study_set: StudySet, current_user=None, db: Session = None) -> StudySetResponse:
+def load_progress_stats(db: Session, user_id: int, study_set_ids: List[int]) -> Dict[int, Tuple[int, datetime | None]]:
+    """
+    Mastered-term count and latest review per study set for one user, read by
+    primary key from learning_set_stats. Sets without progress are absent from
+    the result.
+    """
+    if not study_set_ids:
+        return {}
+    rows = (
+        db.query(
+            LearningSetStats.study_set_id,
+            LearningSetStats.mastered,
+            LearningSetStats.last_reviewed,
+        )
+        .filter(
+            LearningSetStats.user_id == user_id,
+            LearningSetStats.study_set_id.in_(study_set_ids),
+        )
+        .all()
+    )
+    return {row.study_set_id: (int(row.mastered or 0), row.last_reviewed) for row in rows}
+
+
+def term_count_column():
+    """Correlated COUNT(*) of a study set's terms, for queries that skip loading them."""
+    return (
+        select(func.count(Term.id))
+        .where(Term.study_set_id == StudySet.id)
+        .correlate(StudySet)
+        .scalar_subquery()
+        .label("term_count")
+    )
+
+
+def list_query(db: Session, fields: StudySetFields, *columns):
+    """
+    Query yielding ``(StudySet, term_count, *columns)`` rows with the author
+    loaded. Terms are only loaded for ``fields="full"``.
+    """
+    query = db.query(StudySet, term_count_column(), *columns).options(selectinload(StudySet.author))
+    if fields == "full":
+        query = query.options(selectinload(StudySet.terms))
+    return query
+
+
+def term_response(term) -> TermResponse:
+    return TermResponse(
+        id=term.id,
+        term=term.term,
+        definition=term.definition,
+        image_url=term.image_url,
+        starred=term.starred,
+        order=term.order or 0,
+        created_at=term.created_at,
+    )
+
+
+def serialize_study_set(study_set: StudySet, current_user=None, db: Session = None, progress_stats: Dict[int, Tuple[int, datetime | None]] = None, term_count: int | None = None, include_terms: bool = True, terms: List | None = None) -> StudySetResponse:
+    """
+    ``progress_stats`` is a preloaded :func:`load_progress_stats` result; without
+    it the current user's progress for this one set is queried here. With
+    ``include_terms=False`` the terms relationship is never touched and
+    ``term_count`` must be given. ``terms`` (Term objects or TERM_COLUMNS rows)
+    replaces the relationship for sets whose terms were just written.
+    """
     is_owner = bool(current_user and study_set.author_id == current_user.id)
-    term_items = sorted(study_set.terms, key=lambda t: t.order or 0)
-    
-    mastered_count = 0
-    last_reviewed = None
-    
-    if current_user and db:
-        # Calculate progress
-        # MySQL doesn't support FILTER, use CASE instead
-        # Cast sum to Integer to avoid Decimal type issues
-        try:
-            # SQLAlchemy 2.0 case syntax expects positional whens, not list
-            progress_stats = (
-                db.query(
-                    cast(func.sum(case((LearningProgress.status == LearningStatus.MASTERED, 1), else_=0)), Integer).label("mastered"),
-                    func.max(LearningProgress.last_reviewed).label("last_reviewed")
-                )
-                .filter(
-                    LearningProgress.study_set_id == study_set.id,
-                    LearningProgress.user_id == current_user.id
-                )
-                .first()
-            )
-            
-            if progress_stats:
-                # Ensure strictly int
-                mastered_count = int(progress_stats.mastered) if progress_stats.mastered is not None else 0
-                last_reviewed = progress_stats.last_reviewed
-        except Exception as e:
-            print(f"Error calculating progress: {e}")
-            mastered_count = 0
-            last_reviewed = None
+    if terms is None and include_terms:
+        terms = study_set.terms
+    term_items = sorted(terms, key=lambda t: t.order or 0) if include_terms else []
+    if term_count is None:
+        term_count = len(term_items)
+
+    if progress_stats is None and current_user and db:
+        progress_stats = load_progress_stats(db, current_user.id, [study_set.id])
+    mastered_count, last_reviewed = (progress_stats or {}).get(study_set.id, (0, None))
 
     return StudySetResponse(
         id=study_set.id,
@@ -131,42 +196,131 @@ def serialize_study_set(study_set: StudySet, current_user=None, db: Session = No
         is_owner=is_owner,
         is_public=study_set.is_public,
         view_count=study_set.view_count or 0,
-        term_count=len(term_items),
+        term_count=term_count,
         mastered_count=mastered_count,
         last_reviewed=last_reviewed,
         created_at=study_set.created_at,
         updated_at=study_set.updated_at,
-        terms=[
-            TermResponse(
-                id=term.id,
-                term=term.term,
-                definition=term.definition,
-                image_url=term.image_url,
-                starred=term.starred,
-                order=term.order or 0,
-                created_at=term.created_at,
-            )
-            for term in term_items
-        ],
+        terms=[term_response(term) for term in term_items],
     )
 
 
+def serialize_study_sets(rows: List[Tuple], current_user=None, db: Session = None, fields: StudySetFields = "full") -> List[StudySetResponse]:
+    """
+    Serialize :func:`list_query` rows with one progress query instead of one
+    per set.
+    """
+    progress_stats = None
+    if current_user and db:
+        progress_stats = load_progress_stats(db, current_user.id, [row[0].id for row in rows])
+    return [
+        serialize_study_set(
+            row[0],
+            current_user,
+            db,
+            progress_stats,
+            term_count=row[1],
+            include_terms=fields == "full",
+        )
+        for row in rows
+    ]
+
+
+# Public leaderboard shared by all users, keyed by fields and rebuilt once the
+# TTL expires or a set changes; callers slice it to their limit
+TOP_SETS_MAX = 50
+top_sets_cache = TTLCache(maxsize=4, ttl=settings.TOP_SETS_CACHE_TTL_SECONDS)
+
+
+def _get_public_top_study_sets(
+    db: Session,
+    current_user,
+    limit: int = 5,
+    fields: StudySetFields = "full",
+):
+    limit = max(1, min(limit, TOP_SETS_MAX))
+    top = top_sets_cache.get(fields)
+    if top is None:
+        rows = (
+            list_query(db, fields)
+            .filter(StudySet.is_public.is_(True))
+            .order_by(StudySet.view_count.desc(), StudySet.created_at.desc())
+            .limit(TOP_SETS_MAX)
+            .all()
+        )
+        # Viewer-independent snapshot; ownership and progress are overlaid below
+        top = [
+            serialize_study_set(row[0], progress_stats={}, term_count=row[1], include_terms=fields == "full")
+            for row in rows
+        ]
+        top_sets_cache.set(fields, top)
+
+    top = top[:limit]
+    progress_stats = load_progress_stats(db, current_user.id, [item.id for item in top])
+    overlaid = []
+    for item in top:
+        mastered_count, last_reviewed = progress_stats.get(item.id, (0, None))
+        overlaid.append(
+            item.model_copy(
+                update={
+                    "is_owner": item.author_id == current_user.id,
+                    "mastered_count": mastered_count,
+                    "last_reviewed": last_reviewed,
+                }
+            )
+        )
+    return overlaid
+
+
 @router.get("/public/top", response_model=list[StudySetResponse])
-def get_public_top_study_sets(
+async def get_public_top_study_sets(
     limit: int = 5,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    fields: StudySetFields = "full",
+    db: AsyncDB = Depends(get_async_db),
+    current_user=Depends(get_async_current_user),
 ):
-    limit = max(1, min(limit, 50))
-    study_sets = (
-        db.query(StudySet)
-        .options(selectinload(StudySet.terms), selectinload(StudySet.author))
-        .filter(StudySet.is_public.is_(True))
-        .order_by(StudySet.view_count.desc(), StudySet.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-    return [serialize_study_set(study_set, current_user, db) for study_set in study_sets]
+    return await db.run_sync(_get_public_top_study_sets, current_user, limit, fields)
+
+
+# Columns TermResponse is built from
+TERM_COLUMNS = [
+    Term.__table__.c.id,
+    Term.__table__.c.term,
+    Term.__table__.c.definition,
+    Term.__table__.c.image_url,
+    Term.__table__.c.starred,
+    Term.__table__.c.order,
+    Term.__table__.c.created_at,
+]
+
+
+def select_term_rows(db: Session, study_set_id: int) -> List:
+    return db.execute(select(*TERM_COLUMNS).where(Term.study_set_id == study_set_id)).all()
+
+
+def insert_terms(db: Session, study_set_id: int, payload_terms: List) -> List:
+    """
+    Insert terms with one executemany and return their TERM_COLUMNS rows, via
+    RETURNING where the driver supports it for executemany and one narrow
+    SELECT otherwise (MySQL). Does not commit.
+    """
+    rows = [
+        {
+            "study_set_id": study_set_id,
+            "term": term_payload.term,
+            "definition": term_payload.definition,
+            "image_url": term_payload.image_url,
+            "starred": term_payload.starred,
+            "order": term_payload.order if term_payload.order is not None else idx,
+        }
+        for idx, term_payload in enumerate(payload_terms)
+    ]
+    if not rows:
+        return []
+    if db.get_bind().dialect.insert_executemany_returning:
+        return db.execute(insert(Term.__table__).returning(*TERM_COLUMNS), rows).all()
+    db.execute(insert(Term.__table__), rows)
+    return select_term_rows(db, study_set_id)
 
 
 @router.post("", response_model=StudySetResponse, status_code=status.HTTP_201_CREATED)
@@ -184,37 +338,81 @@ def create_study_set(
     db.add(study_set)
     db.flush()
 
-    for idx, term_payload in enumerate(payload.terms):
-        term = Term(
-            study_set_id=study_set.id,
-            term=term_payload.term,
-            definition=term_payload.definition,
-            image_url=term_payload.image_url,
-            order=term_payload.order if term_payload.order is not None else idx,
-        )
-        db.add(term)
-
+    term_rows = insert_terms(db, study_set.id, payload.terms)
+    # Serialize before commit so nothing is reloaded; a new set has no progress
+    response = serialize_study_set(study_set, current_user, db, progress_stats={}, terms=term_rows)
     db.commit()
+    top_sets_cache.clear()
+    popular_sets_cache.clear()
+    daily_plan_cache.pop(current_user.id)
+    reindex_study_sets(db, [response.id])
 
-    study_set = (
-        db.query(StudySet)
-        .options(selectinload(StudySet.terms), selectinload(StudySet.author))
-        .filter(StudySet.id == study_set.id)
-        .first()
-    )
+    return response
 
-    return serialize_study_set(study_set, current_user, db)
 
+# Pre-encoded term lists of recently opened sets, keyed by content revision so
+# edits never need explicit invalidation
+study_set_payload_cache = TTLCache(maxsize=settings.STUDY_SET_PAYLOAD_CACHE_SIZE, ttl=3600)
+_term_list_adapter = TypeAdapter(List[TermResponse])
 
-@router.get("/{study_set_id:int}", response_model=StudySetResponse)
-def get_study_set(
+
+def cached_terms_json(db: Session, study_set: StudySet) -> Tuple[int, bytes]:
+    """``(term_count, terms JSON array)`` for the set's current revision."""
+    key = (study_set.id, study_set.terms_revision, study_set.updated_at)
+    cached = study_set_payload_cache.get(key)
+    if cached is None:
+        rows = db.execute(
+            select(*TERM_COLUMNS)
+            .where(Term.study_set_id == study_set.id)
+            .order_by(Term.order, Term.id)
+        ).all()
+        cached = (len(rows), _term_list_adapter.dump_json([term_response(row) for row in rows]))
+        study_set_payload_cache.set(key, cached)
+    return cached
+
+
+def study_set_etag(study_set: StudySet, response: StudySetResponse) -> str:
+    """
+    Weak validator over the set's content revision and the viewer-specific
+    fields. view_count is deliberately left out, since it changes on every
+    open, so two bodies differing only in view_count share it; that is what
+    makes it weak rather than strong. The terms are covered by terms_revision,
+    so the tag can be checked before they are loaded.
+    """
+    parts = [
+        study_set.id,
+        study_set.terms_revision,
+        study_set.updated_at.isoformat() if study_set.updated_at else "",
+        response.title,
+        response.description,
+        response.is_public,
+        response.author_username,
+        response.is_owner,
+        response.mastered_count,
+        response.last_reviewed.isoformat() if response.last_reviewed else "",
+    ]
+    digest = hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    opaque = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def _get_study_set(
+    db: Session,
+    current_user,
     study_set_id: int,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    if_none_match: str | None = None,
 ):
     study_set = (
         db.query(StudySet)
-        .options(selectinload(StudySet.terms), selectinload(StudySet.author))
+        .options(joinedload(StudySet.author))
         .filter(StudySet.id == study_set_id)
         .first()
     )
@@ -225,68 +423,66 @@ def get_study_set(
     if not is_owner and not study_set.is_public:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study set not found")
 
-    study_set.view_count = (study_set.view_count or 0) + 1
-    db.add(study_set)
-    
-    # Update LearningProgress last_reviewed
-    if current_user:
-        try:
-            progress = (
-                db.query(LearningProgress)
-                .filter(
-                    LearningProgress.study_set_id == study_set.id,
-                    LearningProgress.user_id == current_user.id
-                )
-                .order_by(LearningProgress.last_reviewed.desc()) # Get the most recently reviewed term's progress
-                .first()
-            )
-            
-            if not progress:
-                # If no progress record exists for this user and study set,
-                # create one for the first term (if terms exist) to track activity.
-                if study_set.terms:
-                    first_term = sorted(study_set.terms, key=lambda t: t.order or 0)[0]
-                    progress = LearningProgress(
-                        user_id=current_user.id,
-                        study_set_id=study_set.id,
-                        term_id=first_term.id,
-                        status=LearningStatus.NOT_STARTED,
-                        last_reviewed=datetime.now()
-                    )
-                    db.add(progress)
-            else:
-                # Update the existing progress record's last_reviewed timestamp
-                progress.last_reviewed = datetime.now()
-                db.add(progress)
-        except Exception as e:
-            print(f"Error updating learning progress: {e}")
-            # Don't fail the request if progress update fails
+    # View count and progress touch are buffered, so the read stays a read
+    pending_view = 1
+    if record_view(db, study_set.id, current_user.id if current_user else None):
+        db.commit()
+        pending_view = 0
 
-    db.commit()
-    db.refresh(study_set)
+    # term_count is filled in below; the ETag covers it through terms_revision
+    head = serialize_study_set(study_set, current_user, db, term_count=0, include_terms=False)
+    # Include this view while it is still waiting in the buffer
+    head.view_count += pending_view
 
-    return serialize_study_set(study_set, current_user, db)
+    headers = {"ETag": study_set_etag(study_set, head), "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
+    head.term_count, terms_json = cached_terms_json(db, study_set)
 
-@router.get("/library", response_model=list[StudySetResponse])
-def get_library_study_sets(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    # Splice the cached terms array into the per-request head object
+    head_json = head.model_dump_json(exclude={"terms"}).encode()
+    body = head_json[:-1] + b',"terms":' + terms_json + b"}"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{study_set_id:int}", response_model=StudySetResponse)
+async def get_study_set(
+    study_set_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncDB = Depends(get_async_db),
+    current_user=Depends(get_async_current_user),
 ):
-    # Fetch sets where user is author OR has learning progress
-    # We need to join with LearningProgress to get the last_reviewed time
-    # And sort by that time.
-    
-    # Subquery to get the max last_reviewed for each study set for the current user
-    latest_progress = (
+    """
+    Full study set with terms. Sends an ETag and answers a matching
+    If-None-Match with 304 Not Modified.
+    """
+    return await db.run_sync(_get_study_set, current_user, study_set_id, if_none_match)
+
+
+def library_activity_subquery(db: Session, user_id: int):
+    """``(study_set_id, last_active)`` of every set the user has progress in."""
+    return (
         db.query(
-            LearningProgress.study_set_id,
-            func.max(LearningProgress.last_reviewed).label("last_active")
+            LearningSetStats.study_set_id,
+            LearningSetStats.last_reviewed.label("last_active"),
         )
-        .filter(LearningProgress.user_id == current_user.id)
-        .group_by(LearningProgress.study_set_id)
+        .filter(LearningSetStats.user_id == user_id)
         .subquery()
     )
+
+
+def _get_library_study_sets(
+    db: Session,
+    current_user,
+    fields: StudySetFields = "full",
+):
+    # Fetch sets where user is author OR has learning progress
+    # We need to join with LearningProgress to get the last_reviewed time
+    # And sort by that time.
+    
+    # The latest review for each study set for the current user
+    latest_progress = library_activity_subquery(db, current_user.id)
     
     # Main query
     # We want sets that are either authored by user OR have progress
@@ -294,8 +490,7 @@ def get_library_study_sets(
     
     # Join StudySet with the subquery
     study_sets = (
-        db.query(StudySet, latest_progress.c.last_active)
-        .options(selectinload(StudySet.terms), selectinload(StudySet.author))
+        list_query(db, fields, latest_progress.c.last_active)
         .outerjoin(latest_progress, StudySet.id == latest_progress.c.study_set_id)
         .filter(
             (StudySet.author_id == current_user.id) | 
@@ -307,25 +502,222 @@ def get_library_study_sets(
     # Sort in Python:
     # Priority: last_active > updated_at > created_at
     def get_sort_key(item):
-        study_set, last_active = item
+        study_set, _, last_active = item
         ts = last_active or study_set.updated_at or study_set.created_at
         return ts or datetime.min.replace(tzinfo=None) # Fallback
 
     sorted_items = sorted(study_sets, key=get_sort_key, reverse=True)
     
-    return [serialize_study_set(item[0], current_user, db) for item in sorted_items]
+    return serialize_study_sets(sorted_items, current_user, db, fields)
 
 
-@router.get("", response_model=list[StudySetResponse])
-def list_study_sets(
+@router.get("/library", response_model=list[StudySetResponse])
+async def get_library_study_sets(
+    fields: StudySetFields = "full",
+    db: AsyncDB = Depends(get_async_db),
+    current_user=Depends(get_async_current_user),
+):
+    return await db.run_sync(_get_library_study_sets, current_user, fields)
+
+
+def encode_library_cursor(sort_ts: datetime | None, study_set_id: int) -> str:
+    raw = json.dumps({"ts": sort_ts.isoformat() if sort_ts else None, "id": study_set_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_library_cursor(cursor: str) -> Tuple[datetime | None, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        sort_ts = datetime.fromisoformat(data["ts"]) if data["ts"] else None
+        return sort_ts, int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_before(db: Session, column, id_column, after_ts: datetime, after_id: int):
+    """
+    ``(column, id) < (after_ts, after_id)`` in a form that can seek an index
+    ordered by ``column``: a plain upper bound on the column, then the exact
+    comparison on the rows of that last timestamp.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite keeps DATETIME as text, with or without fractional seconds
+        # depending on who wrote it: bound the text to the cursor's second and
+        # compare exactly on julianday()
+        bound = literal(after_ts.strftime("%Y-%m-%d %H:%M:%S") + ".999999", String)
+        return and_(
+            type_coerce(column, String) <= bound,
+            or_(
+                func.julianday(column) < func.julianday(after_ts),
+                and_(func.julianday(column) == func.julianday(after_ts), id_column < after_id),
+            ),
+        )
+    return and_(
+        column <= after_ts,
+        or_(column < after_ts, and_(column == after_ts, id_column < after_id)),
+    )
+
+
+def _library_streams(db: Session, user_id: int, limit: int, after: Tuple[datetime, int] | None):
+    """
+    The library as three ``(sort_ts, study_set_id)`` lists, each sorted newest
+    first and cut at ``limit`` rows past the cursor:
+
+    - touched sets by their latest review, from learning_set_stats
+      (user_id, last_reviewed, study_set_id);
+    - authored sets never reviewed by their updated_at, from study_sets
+      (author_id, updated_at);
+    - other sets with progress but no review time (rare), by updated_at or
+      created_at.
+
+    The first two are index range scans, so a page costs O(limit) rather than
+    a sort over the whole library. Together the lists hold every library set
+    exactly once, keyed like /library (last_active > updated_at > created_at).
+    """
+    reviewed = select(LearningSetStats.study_set_id).where(
+        LearningSetStats.user_id == user_id,
+        LearningSetStats.study_set_id == StudySet.id,
+        LearningSetStats.last_reviewed.isnot(None),
+    )
+    set_ts = func.coalesce(StudySet.updated_at, StudySet.created_at)
+
+    touched = select(LearningSetStats.last_reviewed, LearningSetStats.study_set_id).where(
+        LearningSetStats.user_id == user_id,
+        LearningSetStats.last_reviewed.isnot(None),
+    )
+    authored = select(StudySet.updated_at, StudySet.id).where(
+        StudySet.author_id == user_id,
+        StudySet.updated_at.isnot(None),
+        ~reviewed.exists(),
+    )
+    unreviewed = (
+        select(set_ts, StudySet.id)
+        .join(LearningSetStats, LearningSetStats.study_set_id == StudySet.id)
+        .where(
+            LearningSetStats.user_id == user_id,
+            LearningSetStats.last_reviewed.is_(None),
+            StudySet.author_id != user_id,
+            set_ts.isnot(None),
+        )
+    )
+    if after:
+        touched = touched.where(keyset_before(db, LearningSetStats.last_reviewed, LearningSetStats.study_set_id, *after))
+        authored = authored.where(keyset_before(db, StudySet.updated_at, StudySet.id, *after))
+        unreviewed = unreviewed.where(keyset_before(db, set_ts, StudySet.id, *after))
+
+    return [
+        db.execute(
+            query.order_by(ts_column.desc(), id_column.desc()).limit(limit)
+        ).all()
+        for query, ts_column, id_column in (
+            (touched, LearningSetStats.last_reviewed, LearningSetStats.study_set_id),
+            (authored, StudySet.updated_at, StudySet.id),
+            (unreviewed, set_ts, StudySet.id),
+        )
+    ]
+
+
+def _get_library_page(
+    db: Session,
+    current_user,
+    limit: int = 50,
+    cursor: str | None = None,
+    fields: StudySetFields = "full",
+):
+    limit = max(1, min(limit, 100))
+    after = None
+    if cursor:
+        after_ts, after_id = decode_library_cursor(cursor)
+        if after_ts is None:
+            # Every library set has a sort timestamp, so nothing follows
+            return StudySetPage(items=[], next_cursor=None)
+        after = (after_ts, after_id)
+
+    # Same priority as /library, with the id as tie-breaker so pages are stable
+    streams = _library_streams(db, current_user.id, limit + 1, after)
+    keys = list(
+        itertools.islice(
+            heapq.merge(*streams, key=lambda row: (row[0], row[1]), reverse=True),
+            limit + 1,
+        )
+    )
+
+    next_cursor = None
+    if len(keys) > limit:
+        keys = keys[:limit]
+        next_cursor = encode_library_cursor(*keys[-1])
+
+    position = {study_set_id: idx for idx, (_, study_set_id) in enumerate(keys)}
+    rows = list_query(db, fields).filter(StudySet.id.in_(position)).all() if keys else []
+    rows.sort(key=lambda row: position[row[0].id])
+    return StudySetPage(
+        items=serialize_study_sets(rows, current_user, db, fields),
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/library/page", response_model=StudySetPage)
+async def get_library_page(
+    limit: int = 50,
+    cursor: str | None = None,
+    fields: StudySetFields = "full",
+    db: AsyncDB = Depends(get_async_db),
+    current_user=Depends(get_async_current_user),
+):
+    """
+    Cursor-paginated library, most recently active first. Pass the returned
+    ``next_cursor`` back as ``cursor`` to fetch the following page.
+    """
+    return await db.run_sync(_get_library_page, current_user, limit, cursor, fields)
+
+
+SEARCH_MAX_LIMIT = 50
+
+
+def _search_study_sets(
+    db: Session,
+    current_user,
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    fields: StudySetFields = "summary",
+):
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    hits = search_public_study_set_ids(db, q, max(0, skip), limit)
+    if not hits:
+        return []
+    rank = {study_set_id: idx for idx, (study_set_id, _) in enumerate(hits)}
+    rows = list_query(db, fields).filter(StudySet.id.in_(rank)).all()
+    rows.sort(key=lambda row: rank[row[0].id])
+    return serialize_study_sets(rows, current_user, db, fields)
+
+
+@router.get("/search", response_model=list[StudySetResponse])
+async def search_study_sets(
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = 0,
+    limit: int = 20,
+    fields: StudySetFields = "summary",
+    db: AsyncDB = Depends(get_async_db),
+    current_user=Depends(get_async_current_user),
+):
+    """
+    Public study sets whose title, description or terms match ``q``, most
+    relevant first, answered from the full-text index (see app.db.search).
+    """
+    return await db.run_sync(_search_study_sets, current_user, q, skip, limit, fields)
+
+
+def _list_study_sets(
+    db: Session,
+    current_user,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    fields: StudySetFields = "full",
 ):
-    study_sets = (
-        db.query(StudySet)
-        .options(selectinload(StudySet.terms), selectinload(StudySet.author))
+    rows = (
+        list_query(db, fields)
         .filter(StudySet.author_id == current_user.id)
         # Show most recently updated first so the home page recent list reflects latest activity
         .order_by(StudySet.updated_at.desc(), StudySet.created_at.desc())
@@ -333,7 +725,108 @@ def list_study_sets(
         .limit(limit)
         .all()
     )
-    return [serialize_study_set(study_set, current_user, db) for study_set in study_sets]
+    return serialize_study_sets(rows, current_user, db, fields)
+
+
+@router.get("", response_model=list[StudySetResponse])
+async def list_study_sets(
+    skip: int = 0,
+    limit: int = 50,
+    fields: StudySetFields = "full",
+    db: AsyncDB = Depends(get_async_db),
+    current_user=Depends(get_async_current_user),
+):
+    return await db.run_sync(_list_study_sets, current_user, skip, limit, fields)
+
+
+def sync_terms(db: Session, study_set_id: int, payload_terms: List[TermUpdate]) -> bool:
+    """
+    Apply an edited term list to a study set without replacing unchanged terms.
+
+    Incoming terms are matched to existing ones by id, then by identical
+    (term, definition). Matched terms keep their id, so learning progress and
+    logs survive the edit; changed ones are updated in one executemany, new
+    ones inserted in one multi-row INSERT and the rest deleted together with
+    their progress and logs. Returns whether anything changed. Does not commit.
+    """
+    existing = {
+        row.id: row
+        for row in db.query(
+            Term.id, Term.term, Term.definition, Term.image_url, Term.starred, Term.order
+        ).filter(Term.study_set_id == study_set_id)
+    }
+    by_content: Dict[Tuple[str, str], deque] = defaultdict(deque)
+    for row in existing.values():
+        by_content[(row.term, row.definition)].append(row.id)
+
+    claimed = set()
+    matches = []
+    unmatched = []
+    for idx, term_payload in enumerate(payload_terms):
+        if term_payload.id in existing and term_payload.id not in claimed:
+            term_id = term_payload.id
+        else:
+            candidates = by_content.get((term_payload.term, term_payload.definition))
+            while candidates and candidates[0] in claimed:
+                candidates.popleft()
+            if not candidates:
+                unmatched.append((idx, term_payload))
+                continue
+            term_id = candidates.popleft()
+        claimed.add(term_id)
+        matches.append((idx, term_payload, existing[term_id]))
+
+    updates = []
+    for idx, term_payload, current in matches:
+        values = {
+            "id": current.id,
+            "term": term_payload.term,
+            "definition": term_payload.definition,
+            "image_url": term_payload.image_url,
+            "order": term_payload.order if term_payload.order is not None else idx,
+            # Clients that do not send starred keep the stored flag
+            "starred": term_payload.starred
+            if "starred" in term_payload.model_fields_set
+            else current.starred,
+        }
+        if any(values[key] != getattr(current, key) for key in values):
+            updates.append(values)
+
+    inserts = [
+        {
+            "study_set_id": study_set_id,
+            "term": term_payload.term,
+            "definition": term_payload.definition,
+            "image_url": term_payload.image_url,
+            "starred": term_payload.starred,
+            "order": term_payload.order if term_payload.order is not None else idx,
+        }
+        for idx, term_payload in unmatched
+    ]
+    removed_ids = [term_id for term_id in existing if term_id not in claimed]
+
+    if updates:
+        db.execute(update(Term), updates)
+    if inserts:
+        db.execute(insert(Term.__table__), inserts)
+    if removed_ids:
+        db.execute(delete(LearningProgress).where(LearningProgress.term_id.in_(removed_ids)))
+        # Answer history survives the edit, detached from the removed terms
+        db.execute(
+            update(LearningProgressLog)
+            .where(LearningProgressLog.term_id.in_(removed_ids))
+            .values(term_id=None)
+        )
+        db.execute(
+            delete(LearningTermStats).where(
+                LearningTermStats.study_set_id == study_set_id,
+                LearningTermStats.term_id.in_(removed_ids),
+            )
+        )
+        rebuild_set_stats(db, study_set_id=study_set_id)
+        db.execute(delete(Term).where(Term.id.in_(removed_ids)))
+
+    return bool(updates or inserts or removed_ids)
 
 
 @router.put("/{study_set_id:int}", response_model=StudySetResponse)
@@ -343,12 +836,7 @@ def update_study_set(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    study_set = (
-        db.query(StudySet)
-        .options(selectinload(StudySet.terms))
-        .filter(StudySet.id == study_set_id)
-        .first()
-    )
+    study_set = db.query(StudySet).filter(StudySet.id == study_set_id).first()
 
     if not study_set or study_set.author_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study set not found")
@@ -357,20 +845,15 @@ def update_study_set(
     study_set.description = payload.description
     study_set.is_public = payload.is_public
 
-    db.query(Term).filter(Term.study_set_id == study_set.id).delete()
-    db.flush()
-
-    for idx, term_payload in enumerate(payload.terms):
-        term = Term(
-            study_set_id=study_set.id,
-            term=term_payload.term,
-            definition=term_payload.definition,
-            image_url=term_payload.image_url,
-            order=term_payload.order if term_payload.order is not None else idx,
-        )
-        db.add(term)
+    if sync_terms(db, study_set.id, payload.terms):
+        study_set.updated_at = func.now()
+        study_set.terms_revision = StudySet.terms_revision + 1
 
     db.commit()
+    top_sets_cache.clear()
+    popular_sets_cache.clear()
+    daily_plan_cache.pop(current_user.id)
+    reindex_study_sets(db, [study_set_id])
 
     study_set = (
         db.query(StudySet)
@@ -392,7 +875,6 @@ def clone_study_set(
     payload = payload or StudySetCloneRequest()
     source_set = (
         db.query(StudySet)
-        .options(selectinload(StudySet.terms), selectinload(StudySet.author))
         .filter(StudySet.id == study_set_id, StudySet.is_public.is_(True))
         .first()
     )
@@ -410,26 +892,169 @@ def clone_study_set(
     db.add(new_set)
     db.flush()
 
-    for idx, term_payload in enumerate(source_set.terms):
-        term = Term(
-            study_set_id=new_set.id,
-            term=term_payload.term,
-            definition=term_payload.definition,
-            image_url=term_payload.image_url,
-            order=term_payload.order if term_payload.order is not None else idx,
+    # Copy the terms server-side; their text never round-trips through Python
+    terms_table = Term.__table__
+    db.execute(
+        insert(terms_table).from_select(
+            ["study_set_id", "term", "definition", "image_url", "order"],
+            select(
+                literal(new_set.id),
+                terms_table.c.term,
+                terms_table.c.definition,
+                terms_table.c.image_url,
+                terms_table.c.order,
+            )
+            .where(terms_table.c.study_set_id == source_set.id)
+            .order_by(terms_table.c.order, terms_table.c.id),
         )
-        db.add(term)
-
+    )
+    term_rows = select_term_rows(db, new_set.id)
+    response = serialize_study_set(new_set, current_user, db, progress_stats={}, terms=term_rows)
     db.commit()
+    top_sets_cache.clear()
+    popular_sets_cache.clear()
+    daily_plan_cache.pop(current_user.id)
+    reindex_study_sets(db, [response.id])
 
-    new_set = (
-        db.query(StudySet)
-        .options(selectinload(StudySet.terms), selectinload(StudySet.author))
-        .filter(StudySet.id == new_set.id)
-        .first()
+    return response
+
+
+IMPORT_DELIMITERS = {"tab": "\t", "comma": ",", "semicolon": ";"}
+MAX_IMPORT_ERRORS = 100
+
+
+def read_term_rows(text, delimiter: TermImportDelimiter):
+    """
+    Yield ``(line, fields)`` for each non-blank record of a CSV/TSV stream.
+    Quoted fields may span lines. ``auto`` picks tab, comma or semicolon from
+    the first line (tab for Quizlet exports).
+    """
+    first_line = text.readline()
+    if delimiter == "auto":
+        delimiter = next((name for name in ("tab", "comma", "semicolon") if IMPORT_DELIMITERS[name] in first_line), "tab")
+    reader = csv.reader(itertools.chain([first_line], text), delimiter=IMPORT_DELIMITERS[delimiter])
+    for fields in reader:
+        if any(field.strip() for field in fields):
+            yield reader.line_num, fields
+
+
+@router.post("/{study_set_id:int}/import", response_model=TermImportResult)
+def import_terms(
+    study_set_id: int,
+    file: UploadFile = File(...),
+    delimiter: TermImportDelimiter = "auto",
+    has_header: bool = False,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Append terms from a CSV/TSV upload (term, definition per row; extra columns
+    are ignored). The upload is parsed as a stream and written in chunks of
+    TERM_IMPORT_CHUNK_SIZE rows, so large files are never held in memory.
+    Invalid rows are skipped and reported; valid ones are committed together.
+    """
+    study_set = db.query(StudySet).filter(StudySet.id == study_set_id).first()
+    if not study_set or study_set.author_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study set not found")
+
+    term_limit = Term.__table__.c.term.type.length
+    definition_limit = Term.__table__.c.definition.type.length
+    next_order = (
+        db.query(func.coalesce(func.max(Term.order) + 1, 0))
+        .filter(Term.study_set_id == study_set.id)
+        .scalar()
     )
 
-    return serialize_study_set(new_set, current_user, db)
+    imported = 0
+    skipped = 0
+    errors: List[TermImportError] = []
+    chunk: List[dict] = []
+
+    def reject(line: int, message: str) -> None:
+        nonlocal skipped
+        skipped += 1
+        if len(errors) < MAX_IMPORT_ERRORS:
+            errors.append(TermImportError(line=line, message=message))
+
+    def flush() -> None:
+        nonlocal imported
+        if chunk:
+            db.execute(insert(Term.__table__), chunk)
+            imported += len(chunk)
+            chunk.clear()
+
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        rows = read_term_rows(text, delimiter)
+        if has_header:
+            next(rows, None)
+        for line, fields in rows:
+            if imported + skipped + len(chunk) >= settings.TERM_IMPORT_MAX_ROWS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Import is limited to {settings.TERM_IMPORT_MAX_ROWS} rows",
+                )
+            term = fields[0].strip()
+            definition = fields[1].strip() if len(fields) > 1 else ""
+            if not term or not definition:
+                reject(line, "Missing term or definition")
+            elif len(term) > term_limit:
+                reject(line, f"Term is longer than {term_limit} characters")
+            elif len(definition) > definition_limit:
+                reject(line, f"Definition is longer than {definition_limit} characters")
+            else:
+                chunk.append({
+                    "study_set_id": study_set.id,
+                    "term": term,
+                    "definition": definition,
+                    "starred": False,
+                    "order": next_order,
+                })
+                next_order += 1
+                if len(chunk) >= settings.TERM_IMPORT_CHUNK_SIZE:
+                    flush()
+        flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Could not parse file: {e}")
+    except HTTPException:
+        db.rollback()
+        raise
+    finally:
+        text.detach()
+
+    if imported:
+        study_set.updated_at = func.now()
+        study_set.terms_revision = StudySet.terms_revision + 1
+    db.commit()
+    if imported:
+        top_sets_cache.clear()
+        popular_sets_cache.clear()
+        daily_plan_cache.pop(current_user.id)
+        reindex_study_sets(db, [study_set_id])
+
+    term_count = db.query(func.count(Term.id)).filter(Term.study_set_id == study_set_id).scalar()
+    return TermImportResult(imported=imported, skipped=skipped, term_count=term_count, errors=errors)
+
+
+@router.get("/{study_set_id:int}/export")
+def export_terms(
+    study_set_id: int,
+    format: ExportFormat = "csv",
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """Download a set's terms as CSV (re-importable via /import) or NDJSON."""
+    study_set = db.query(StudySet).filter(StudySet.id == study_set_id).first()
+    if not study_set or (study_set.author_id != current_user.id and not study_set.is_public):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study set not found")
+
+    statement = (
+        select(Term.term, Term.definition, Term.image_url, Term.starred, Term.order)
+        .where(Term.study_set_id == study_set_id)
+        .order_by(Term.order, Term.id)
+    )
+    return export_response(statement, format, f"study-set-{study_set_id}")
 
 
 @router.post("/{study_set_id:int}/ai-exam")
@@ -522,18 +1147,11 @@ def toggle_term_star(
 
     term.starred = not term.starred
     db.add(term)
+    study_set.terms_revision = StudySet.terms_revision + 1
     db.commit()
     db.refresh(term)
 
-    return TermResponse(
-        id=term.id,
-        term=term.term,
-        definition=term.definition,
-        image_url=term.image_url,
-        starred=term.starred,
-        order=term.order or 0,
-        created_at=term.created_at,
-    )
+    return term_response(term)
 
 
 @router.post("/{study_set_id:int}/reset-progress", status_code=status.HTTP_200_OK)
@@ -556,8 +1174,10 @@ def reset_study_set_progress(
         LearningProgress.study_set_id == study_set_id,
         LearningProgress.user_id == current_user.id
     ).delete()
+    rebuild_set_stats(db, user_id=current_user.id, study_set_id=study_set_id)
     
     db.commit()
+    daily_plan_cache.pop(current_user.id)
     
     return {"message": "Progress reset successfully"}
 
@@ -578,6 +1198,13 @@ def delete_study_set(
     # Clean up dependent records first to avoid FK issues
     db.query(LearningProgress).filter(LearningProgress.study_set_id == study_set_id).delete()
     db.query(LearningProgressLog).filter(LearningProgressLog.study_set_id == study_set_id).delete()
+    db.query(LearningSetStats).filter(LearningSetStats.study_set_id == study_set_id).delete()
+    db.query(LearningTermStats).filter(LearningTermStats.study_set_id == study_set_id).delete()
+    # Dropped here rather than queued: the doc references the set
+    db.query(StudySetSearchDoc).filter(StudySetSearchDoc.study_set_id == study_set_id).delete()
 
     db.delete(study_set)
     db.commit()
+    top_sets_cache.clear()
+    popular_sets_cache.clear()
+    daily_plan_cache.pop(current_user.id)
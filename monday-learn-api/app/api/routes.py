@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, study_sets, folders, learning, study_groups, ai_configs, analysis, calendar, materials
+from app.api.endpoints import auth, study_sets, folders, learning, study_groups, ai_configs, analysis, calendar, materials, metrics
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -11,6 +11,7 @@ api_router.include_router(ai_configs.router, prefix="/admin/ai-configs", tags=["
 api_router.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
 api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
 api_router.include_router(materials.router, prefix="/materials", tags=["materials"])
+api_router.include_router(metrics.router, prefix="/admin/metrics", tags=["metrics"])
 
 @api_router.get("/health")
 async def health_check():
@@ -0,0 +1,180 @@
+import queue
+import threading
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, List
+
+from loguru import logger
+
+
+class BatchWorker:
+    """
+    Bounded in-process queue drained by a background thread.
+
+    Items are handed to ``handler`` in batches of up to ``batch_size`` items, or
+    whatever has accumulated after ``flush_interval_ms``. A batch the handler
+    fails on is retried in halves down to single items, and only the items that
+    still fail are dropped (counted in ``failed_items``). ``submit`` never blocks:
+    it returns False when the worker is not running or the queue is full, so the
+    caller can fall back to doing the work synchronously.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[List[Any]], None],
+        *,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval_ms: int,
+    ):
+        self.name = name
+        self._handler = handler
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(1, flush_interval_ms) / 1000
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+        self._submitted = 0
+        self._rejected = 0
+        self._flushes = 0
+        self._flushed_items = 0
+        self._failed_items = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return (
+            self._thread is not None
+            and self._thread.is_alive()
+            and not self._stopping.is_set()
+        )
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info("Background worker {} started", self.name)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop accepting items and drain everything still queued."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+        # Anything submitted while the thread was exiting is flushed inline
+        leftover = self._drain_nowait(self._queue.qsize())
+        while leftover:
+            self._flush(leftover)
+            leftover = self._drain_nowait(self._batch_size)
+        logger.info("Background worker {} stopped", self.name)
+
+    def submit(self, item: Any) -> bool:
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            return False
+        with self._lock:
+            self._submitted += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_size": self._queue.maxsize,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "flushes": self._flushes,
+                "flushed_items": self._flushed_items,
+                "failed_items": self._failed_items,
+                "last_flush_ms": round(self._last_flush_ms, 2),
+                "avg_flush_ms": round(self._total_flush_ms / self._flushes, 2)
+                if self._flushes
+                else 0.0,
+                "max_flush_ms": round(self._max_flush_ms, 2),
+            }
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                break
+
+    def _collect(self) -> List[Any]:
+        if self._stopping.is_set():
+            return self._drain_nowait(self._batch_size)
+
+        batch: List[Any] = []
+        deadline = monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain_nowait(self, limit: int) -> List[Any]:
+        items: List[Any] = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _flush(self, batch: List[Any]) -> None:
+        start = perf_counter()
+        failed = self._handle(batch)
+        duration_ms = (perf_counter() - start) * 1000
+
+        with self._lock:
+            self._flushes += 1
+            self._flushed_items += len(batch) - failed
+            self._failed_items += failed
+            self._last_flush_ms = duration_ms
+            self._total_flush_ms += duration_ms
+            self._max_flush_ms = max(self._max_flush_ms, duration_ms)
+
+    def _handle(self, items: List[Any]) -> int:
+        """
+        Hand ``items`` to the handler; if it fails, retry each half separately
+        so one bad item only costs itself. The handler is expected to roll back
+        on failure. Returns how many items were dropped.
+        """
+        try:
+            self._handler(items)
+            return 0
+        except Exception:
+            if len(items) == 1:
+                logger.exception(
+                    "Background worker {} dropped an item it failed to flush: {!r}",
+                    self.name,
+                    items[0],
+                )
+                return 1
+            logger.warning(
+                "Background worker {} failed to flush {} items; retrying in halves",
+                self.name,
+                len(items),
+            )
+        middle = len(items) // 2
+        return self._handle(items[:middle]) + self._handle(items[middle:])
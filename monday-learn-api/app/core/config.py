@@ -17,6 +17,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 52560000
+    # Max concurrent bcrypt hash/verify calls per worker process
+    PASSWORD_HASH_CONCURRENCY: int = 4
     
     # Database
     MYSQL_USER: str = os.getenv("MYSQL_USER", "root")
@@ -24,11 +26,76 @@ class Settings(BaseSettings):
     MYSQL_SERVER: str = os.getenv("MYSQL_SERVER", "localhost")
     MYSQL_PORT: str = os.getenv("MYSQL_PORT", "3306")
     MYSQL_DB: str = os.getenv("MYSQL_DB", "monday_learn")
+
+    # Connection pool (per engine, per worker process). Checkout wait and
+    # exhaustion are reported by GET /admin/metrics/db-pool.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before raising (surfaces as a 500)
+    DB_POOL_TIMEOUT: int = 30
+    # Reopen connections older than this; keep below MySQL wait_timeout (-1 disables)
+    DB_POOL_RECYCLE: int = 3600
+    # Ping on every checkout. Costs a round trip per request; with a recycle below
+    # wait_timeout it can usually be turned off and stale connections are then
+    # only detected (and the pool invalidated) when a query fails.
+    DB_POOL_PRE_PING: bool = True
     
+    # Async engine for the ported hot endpoints (learning, study_sets, calendar).
+    # Off by default: those endpoints then run on the sync engine in the thread pool.
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_MYSQL_DRIVER: str = "aiomysql"  # or "asyncmy"
+    # Full async URL override, e.g. sqlite+aiosqlite:///./monday_learn.db for local tests
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Authenticated user cache used by get_current_user
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # CSV/TSV term import: rows per INSERT and rows per upload
+    TERM_IMPORT_CHUNK_SIZE: int = 1000
+    TERM_IMPORT_MAX_ROWS: int = 100000
+
+    # Rows fetched per server-side cursor batch by the CSV/NDJSON exports
+    EXPORT_YIELD_PER: int = 1000
+
+    # Buffered study set view counts, flushed as one batched UPDATE
+    STUDY_SET_VIEW_QUEUE_SIZE: int = 10000
+    STUDY_SET_VIEW_BATCH_SIZE: int = 5000
+    STUDY_SET_VIEW_FLUSH_INTERVAL_MS: int = 5000
+    # Opening a set refreshes the viewer's progress (library order) at most this
+    # often per user and set; 0 turns the refresh off
+    STUDY_SET_TOUCH_INTERVAL_SECONDS: int = 300
+
+    # Background refresh of study set search docs
+    SEARCH_INDEX_QUEUE_SIZE: int = 10000
+    SEARCH_INDEX_BATCH_SIZE: int = 200
+    SEARCH_INDEX_FLUSH_INTERVAL_MS: int = 1000
+
+    # Per-user daily plan on the Home dashboard
+    DAILY_PLAN_CACHE_TTL_SECONDS: int = 30
+
+    # Pre-encoded term lists of recently opened study sets
+    STUDY_SET_PAYLOAD_CACHE_SIZE: int = 128
+
+    # Public top-sets leaderboard cache
+    TOP_SETS_CACHE_TTL_SECONDS: int = 60
+
+    # Write-behind buffer for learning_progress_logs
+    LEARNING_LOG_WRITER_ENABLED: bool = True
+    LEARNING_LOG_QUEUE_SIZE: int = 10000
+    LEARNING_LOG_BATCH_SIZE: int = 500
+    LEARNING_LOG_FLUSH_INTERVAL_MS: int = 200
+
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}:{self.MYSQL_PORT}/{self.MYSQL_DB}?charset=utf8mb4"
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return f"mysql+{self.ASYNC_MYSQL_DRIVER}://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_SERVER}:{self.MYSQL_PORT}/{self.MYSQL_DB}?charset=utf8mb4"
+
     class Config:
         case_sensitive = True
 
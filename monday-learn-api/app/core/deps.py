@@ -1,33 +1,82 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import AsyncDB, get_async_db, get_db
 from app.models.user import User
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Column snapshots of authenticated users keyed by token subject (username)
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
+
+def invalidate_cached_user(*usernames: str | None) -> None:
+    """Drop cached principals, e.g. after a username/avatar/is_active change."""
+    for username in usernames:
+        if username:
+            user_cache.pop(username)
+
+
+def _load_user(db: Session, username: str) -> User | None:
+    snapshot = user_cache.get(username)
+    if snapshot is not None:
+        # Rebuild a per-request instance and attach it without a SELECT, so
+        # lazy relationships and updates behave as for a queried user
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    user = db.query(User).filter(User.username == username).first()
+    if user:
+        user_cache.set(username, {key: getattr(user, key) for key in _USER_COLUMNS})
+    return user
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_username(token: str) -> str:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str | None = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    username: str | None = payload.get("sub")
+    if username is None:
+        raise _credentials_exception()
+    return username
 
-    user = db.query(User).filter(User.username == username).first()
+
+def _check_user(user: User | None) -> User:
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
-
     return user
+
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+    return _check_user(_load_user(db, _token_username(token)))
+
+
+async def get_async_current_user(
+    db: AsyncDB = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    get_current_user for async endpoints: resolves the user on the request's
+    get_async_db session, so with ASYNC_DB_ENABLED a cache miss is a query on
+    the async engine rather than a sync connection in the thread pool.
+    """
+    return _check_user(await db.run_sync(_load_user, _token_username(token)))
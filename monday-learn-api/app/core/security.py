@@ -1,9 +1,14 @@
 import bcrypt
+from anyio import CapacityLimiter, to_thread
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt
 from app.core.config import settings
 
+# bcrypt is deliberately slow (~250ms CPU per call); cap how many hashes run at
+# once so a login storm cannot starve the worker's thread pool
+password_hash_limiter = CapacityLimiter(settings.PASSWORD_HASH_CONCURRENCY)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -19,3 +24,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await to_thread.run_sync(
+        verify_password, plain_password, hashed_password, limiter=password_hash_limiter
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    return await to_thread.run_sync(
+        get_password_hash, password, limiter=password_hash_limiter
+    )
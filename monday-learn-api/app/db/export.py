@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterator, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def iter_export(statement: Select, fmt: ExportFormat) -> Iterator[str]:
+    """
+    Run ``statement`` on its own session with a server-side cursor and yield
+    the result as CSV (header first) or NDJSON, one chunk per fetched batch of
+    EXPORT_YIELD_PER rows.
+
+    The request's session is closed before a streaming body is sent, so the
+    generator opens and closes its own.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+        keys = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            # BOM so spreadsheet apps detect UTF-8
+            buffer.write("\ufeff")
+            writer.writerow(keys)
+        for partition in result.partitions():
+            for row in partition:
+                values = [_plain(value) for value in row]
+                if fmt == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(keys, values)), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def export_response(statement: Select, fmt: ExportFormat, filename: str) -> StreamingResponse:
+    """StreamingResponse that downloads ``statement``'s rows as ``filename.<fmt>``."""
+    return StreamingResponse(
+        iter_export(statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
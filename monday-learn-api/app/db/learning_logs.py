@@ -0,0 +1,175 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import Integer, case, cast, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.background import BatchWorker
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import upsert
+from app.models.daily_learning_summary import DailyLearningSummary
+from app.models.learning_progress_log import LearningProgressLog
+from app.models.learning_term_stats import LearningTermStats
+
+
+# Activity level (0-4) thresholds for the calendar heatmap:
+# Level 1: > 0 mins (Started)
+# Level 2: > 10 mins OR > 20 words
+# Level 3: > 30 mins OR > 50 words
+# Level 4: > 60 mins OR > 100 words
+ACTIVITY_LEVELS = [(4, 60 * 60000, 100), (3, 30 * 60000, 50), (2, 10 * 60000, 20)]
+
+
+def activity_level(total_time_ms, total_words_reviewed):
+    """SQL CASE mapping daily totals (column or bound expressions) to a heatmap level."""
+    return case(
+        *[
+            ((total_time_ms > ms) | (total_words_reviewed > words), level)
+            for level, ms, words in ACTIVITY_LEVELS
+        ],
+        else_=1,
+    )
+
+
+def bump_daily_summaries(db: Session, totals: Dict[Tuple[int, date], List[int]]) -> None:
+    """
+    Add per-(user, day) time and word totals to daily_learning_summaries with one
+    atomic upsert, so concurrent answers never lose increments.
+    """
+    table = DailyLearningSummary.__table__
+    rows = [
+        {
+            "user_id": user_id,
+            "date": day,
+            "total_time_ms": time_spent_ms,
+            "total_words_reviewed": words_reviewed,
+            "activity_level": activity_level(
+                literal(time_spent_ms), literal(words_reviewed)
+            ),
+        }
+        for (user_id, day), (time_spent_ms, words_reviewed) in totals.items()
+    ]
+
+    def update(proposed):
+        new_time = func.coalesce(table.c.total_time_ms, 0) + proposed.total_time_ms
+        new_words = (
+            func.coalesce(table.c.total_words_reviewed, 0)
+            + proposed.total_words_reviewed
+        )
+        # activity_level first: MySQL evaluates assignments left to right
+        return [
+            ("activity_level", activity_level(new_time, new_words)),
+            ("total_time_ms", new_time),
+            ("total_words_reviewed", new_words),
+        ]
+
+    upsert(db, table, rows, conflict_columns=["user_id", "date"], update=update)
+
+
+def bump_term_stats(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Add the attempts and errors of answer logs to learning_term_stats with one
+    atomic upsert. Does not commit.
+    """
+    counters: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for row in rows:
+        key = (row["user_id"], row["term_id"])
+        counter = counters.setdefault(
+            key,
+            {
+                "user_id": row["user_id"],
+                "term_id": row["term_id"],
+                "study_set_id": row["study_set_id"],
+                "attempts": 0,
+                "errors": 0,
+            },
+        )
+        counter["attempts"] += 1
+        counter["errors"] += 0 if row["is_correct"] else 1
+
+    table = LearningTermStats.__table__
+
+    def update(proposed):
+        return [
+            ("attempts", table.c.attempts + proposed.attempts),
+            ("errors", table.c.errors + proposed.errors),
+        ]
+
+    upsert(db, table, list(counters.values()), conflict_columns=["user_id", "term_id"], update=update)
+
+
+def rebuild_term_stats(db: Session, *, user_id: int | None = None, study_set_id: int | None = None) -> None:
+    """
+    Recompute learning_term_stats from learning_progress_logs, for one user
+    and/or set or (with no filter) everything. Does not commit.
+    """
+    stats_filters = []
+    log_filters = []
+    if user_id is not None:
+        stats_filters.append(LearningTermStats.user_id == user_id)
+        log_filters.append(LearningProgressLog.user_id == user_id)
+    if study_set_id is not None:
+        stats_filters.append(LearningTermStats.study_set_id == study_set_id)
+        log_filters.append(LearningProgressLog.study_set_id == study_set_id)
+
+    db.execute(delete(LearningTermStats).where(*stats_filters))
+    db.execute(
+        insert(LearningTermStats.__table__).from_select(
+            ["user_id", "term_id", "study_set_id", "attempts", "errors"],
+            select(
+                LearningProgressLog.user_id,
+                LearningProgressLog.term_id,
+                func.min(LearningProgressLog.study_set_id),
+                func.count(LearningProgressLog.id),
+                cast(func.sum(case((LearningProgressLog.is_correct.is_(False), 1), else_=0)), Integer),
+            )
+            .where(LearningProgressLog.term_id.isnot(None), *log_filters)
+            .group_by(LearningProgressLog.user_id, LearningProgressLog.term_id),
+        )
+    )
+
+
+def write_learning_logs(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert answer logs with one multi-row INSERT and fold them into the daily
+    summaries and per-term counters with an upsert each. Does not commit.
+    """
+    if not rows:
+        return
+    db.execute(insert(LearningProgressLog.__table__), rows)
+
+    totals: Dict[Tuple[int, date], List[int]] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        logged_at = row.get("created_at") or datetime.now()
+        bucket = totals[(row["user_id"], logged_at.date())]
+        bucket[0] += row.get("time_spent_ms") or 0
+        bucket[1] += 1
+
+    bump_daily_summaries(db, totals)
+    bump_term_stats(db, rows)
+    db.flush()
+
+
+def _flush_learning_logs(rows: List[Dict[str, Any]]) -> None:
+    db = SessionLocal()
+    try:
+        write_learning_logs(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# Write-behind buffer for answer logs. Started/stopped by the app lifespan in
+# main.py; when it is not running or its queue is full, callers write inline.
+learning_log_writer = BatchWorker(
+    "learning-log-writer",
+    _flush_learning_logs,
+    max_queue_size=settings.LEARNING_LOG_QUEUE_SIZE,
+    batch_size=settings.LEARNING_LOG_BATCH_SIZE,
+    flush_interval_ms=settings.LEARNING_LOG_FLUSH_INTERVAL_MS,
+)
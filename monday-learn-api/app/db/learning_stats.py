@@ -0,0 +1,125 @@
+"""
+Maintenance of learning_set_stats, the per-(user, set) status counters.
+
+Answer and view paths report each progress row's status change through
+:func:`status_change` and apply them with one upsert via
+:func:`bump_set_stats`. Bulk deletes of progress (resets, removed terms,
+deleted sets) recompute the affected rows with :func:`rebuild_set_stats`.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy import Integer, case, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import upsert
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.learning_set_stats import LearningSetStats
+
+STATUS_COLUMNS = {
+    LearningStatus.NOT_STARTED: "not_started",
+    LearningStatus.FAMILIAR: "familiar",
+    LearningStatus.MASTERED: "mastered",
+}
+
+
+def status_change(
+    user_id: int,
+    study_set_id: int,
+    before: LearningStatus | None,
+    after: LearningStatus | None,
+    last_reviewed: datetime | None = None,
+) -> Dict[str, Any]:
+    """Counter delta of one progress row going from ``before`` to ``after`` (None: no row)."""
+    row = {
+        "user_id": user_id,
+        "study_set_id": study_set_id,
+        "not_started": 0,
+        "familiar": 0,
+        "mastered": 0,
+        "last_reviewed": last_reviewed,
+    }
+    if before is not None:
+        row[STATUS_COLUMNS[LearningStatus(before)]] -= 1
+    if after is not None:
+        row[STATUS_COLUMNS[LearningStatus(after)]] += 1
+    return row
+
+
+def bump_set_stats(db: Session, changes: Iterable[Dict[str, Any]]) -> None:
+    """Add :func:`status_change` deltas to the counters with a single upsert. Does not commit."""
+    merged: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for change in changes:
+        key = (change["user_id"], change["study_set_id"])
+        row = merged.get(key)
+        if row is None:
+            merged[key] = dict(change)
+            continue
+        for column in STATUS_COLUMNS.values():
+            row[column] += change[column]
+        if change["last_reviewed"] and (not row["last_reviewed"] or change["last_reviewed"] > row["last_reviewed"]):
+            row["last_reviewed"] = change["last_reviewed"]
+    if not merged:
+        return
+
+    table = LearningSetStats.__table__
+
+    def update(new):
+        return [
+            ("not_started", table.c.not_started + new.not_started),
+            ("familiar", table.c.familiar + new.familiar),
+            ("mastered", table.c.mastered + new.mastered),
+            (
+                "last_reviewed",
+                case(
+                    (new.last_reviewed.is_(None), table.c.last_reviewed),
+                    (table.c.last_reviewed.is_(None), new.last_reviewed),
+                    (new.last_reviewed > table.c.last_reviewed, new.last_reviewed),
+                    else_=table.c.last_reviewed,
+                ),
+            ),
+        ]
+
+    upsert(
+        db,
+        table,
+        list(merged.values()),
+        conflict_columns=["user_id", "study_set_id"],
+        update=update,
+    )
+
+
+def _count(status: LearningStatus):
+    return cast(func.coalesce(func.sum(case((LearningProgress.status == status, 1), else_=0)), 0), Integer)
+
+
+def rebuild_set_stats(db: Session, *, user_id: int | None = None, study_set_id: int | None = None) -> None:
+    """
+    Recompute the counters from learning_progress, for one user and/or set or
+    (with no filter) everything. Does not commit.
+    """
+    stats_filters = []
+    progress_filters = []
+    if user_id is not None:
+        stats_filters.append(LearningSetStats.user_id == user_id)
+        progress_filters.append(LearningProgress.user_id == user_id)
+    if study_set_id is not None:
+        stats_filters.append(LearningSetStats.study_set_id == study_set_id)
+        progress_filters.append(LearningProgress.study_set_id == study_set_id)
+
+    db.execute(delete(LearningSetStats).where(*stats_filters))
+    db.execute(
+        insert(LearningSetStats.__table__).from_select(
+            ["user_id", "study_set_id", "not_started", "familiar", "mastered", "last_reviewed"],
+            select(
+                LearningProgress.user_id,
+                LearningProgress.study_set_id,
+                _count(LearningStatus.NOT_STARTED),
+                _count(LearningStatus.FAMILIAR),
+                _count(LearningStatus.MASTERED),
+                func.max(LearningProgress.last_reviewed),
+            )
+            .where(*progress_filters)
+            .group_by(LearningProgress.user_id, LearningProgress.study_set_id),
+        )
+    )
@@ -1,6 +1,11 @@
 from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
 from loguru import logger
 
+from app.db.learning_logs import rebuild_term_stats
+from app.db.learning_stats import rebuild_set_stats
+from app.db.search import create_search_index, rebuild_search_docs, search_index_exists
+
 
 def ensure_ai_config_total_tokens(engine) -> None:
     """
@@ -186,12 +191,317 @@ def ensure_learning_progress_srs_fields(engine) -> None:
     logger.success("SRS fields added to learning_progress")
 
 
+def ensure_daily_learning_summary_unique(engine) -> None:
+    """
+    Merge duplicate (user_id, date) rows in daily_learning_summaries and add the
+    unique key the atomic upsert in record_learning_log relies on.
+    """
+    inspector = inspect(engine)
+    if "daily_learning_summaries" not in inspector.get_table_names():
+        logger.warning(
+            "daily_learning_summaries table missing; skipping unique key migration"
+        )
+        return
+
+    index_name = "uq_daily_learning_summaries_user_date"
+    existing = {idx["name"] for idx in inspector.get_indexes("daily_learning_summaries")}
+    existing |= {
+        uc["name"] for uc in inspector.get_unique_constraints("daily_learning_summaries")
+    }
+    if index_name in existing:
+        return
+
+    logger.info("Deduplicating daily_learning_summaries before adding unique key")
+    with engine.connect() as conn:
+        duplicates = conn.execute(
+            text(
+                """
+            SELECT user_id, date, MIN(id) AS keep_id,
+                   SUM(COALESCE(total_time_ms, 0)) AS total_time_ms,
+                   SUM(COALESCE(total_words_reviewed, 0)) AS total_words_reviewed
+            FROM daily_learning_summaries
+            GROUP BY user_id, date
+            HAVING COUNT(*) > 1
+        """
+            )
+        ).all()
+        for row in duplicates:
+            conn.execute(
+                text(
+                    """
+                UPDATE daily_learning_summaries
+                SET total_time_ms = :total_time_ms,
+                    total_words_reviewed = :total_words_reviewed,
+                    activity_level = CASE
+                        WHEN :total_time_ms > 3600000 OR :total_words_reviewed > 100 THEN 4
+                        WHEN :total_time_ms > 1800000 OR :total_words_reviewed > 50 THEN 3
+                        WHEN :total_time_ms > 600000 OR :total_words_reviewed > 20 THEN 2
+                        ELSE 1
+                    END
+                WHERE id = :keep_id
+            """
+                ),
+                {
+                    "total_time_ms": int(row.total_time_ms),
+                    "total_words_reviewed": int(row.total_words_reviewed),
+                    "keep_id": row.keep_id,
+                },
+            )
+            conn.execute(
+                text(
+                    """
+                DELETE FROM daily_learning_summaries
+                WHERE user_id = :user_id AND date = :date AND id <> :keep_id
+            """
+                ),
+                {"user_id": row.user_id, "date": row.date, "keep_id": row.keep_id},
+            )
+        conn.execute(
+            text(
+                f"CREATE UNIQUE INDEX {index_name} "
+                "ON daily_learning_summaries (user_id, date)"
+            )
+        )
+        conn.commit()
+    logger.success(
+        "Merged {} duplicate daily summaries and added {}", len(duplicates), index_name
+    )
+
+
+def ensure_study_set_terms_revision(engine) -> None:
+    """
+    Add study_sets.terms_revision, the counter behind the study set ETag.
+    """
+    inspector = inspect(engine)
+    if "study_sets" not in inspector.get_table_names():
+        logger.warning("study_sets table missing; skipping terms_revision migration")
+        return
+
+    column_names = [col["name"] for col in inspector.get_columns("study_sets")]
+    if "terms_revision" in column_names:
+        return
+
+    logger.info("Adding terms_revision column to study_sets table")
+    with engine.connect() as conn:
+        conn.execute(
+            text("ALTER TABLE study_sets ADD COLUMN terms_revision INT NOT NULL DEFAULT 0")
+        )
+        conn.commit()
+    logger.success("Added terms_revision column to study_sets table")
+
+
+def ensure_study_set_search_index(engine) -> None:
+    """
+    Create the full-text index over study_set_search_docs and backfill the
+    docs of existing study sets on first run.
+    """
+    inspector = inspect(engine)
+    if "study_set_search_docs" not in inspector.get_table_names():
+        logger.warning("study_set_search_docs table missing; skipping search index migration")
+        return
+
+    if not search_index_exists(engine):
+        logger.info("Creating full-text index on study_set_search_docs")
+        create_search_index(engine)
+        logger.success("Created full-text index on study_set_search_docs")
+
+    with engine.connect() as conn:
+        has_docs = conn.execute(text("SELECT 1 FROM study_set_search_docs LIMIT 1")).first()
+        has_sets = conn.execute(text("SELECT 1 FROM study_sets LIMIT 1")).first()
+    if has_sets and not has_docs:
+        logger.info("Backfilling study set search docs")
+        rebuild_search_docs(sessionmaker(bind=engine))
+        logger.success("Backfilled study set search docs")
+
+
+def ensure_learning_logs_term_id_nullable(engine) -> None:
+    """
+    Allow learning_progress_logs.term_id to be NULL, so answers to a term that
+    is removed from its set are kept instead of deleted. SQLite can't alter a
+    column, so there the table is rebuilt and its rows copied over.
+    """
+    inspector = inspect(engine)
+    if "learning_progress_logs" not in inspector.get_table_names():
+        logger.warning("learning_progress_logs table missing; skipping term_id migration")
+        return
+    columns = {col["name"]: col for col in inspector.get_columns("learning_progress_logs")}
+    if columns["term_id"]["nullable"]:
+        return
+
+    logger.info("Making learning_progress_logs.term_id nullable")
+    if engine.dialect.name == "sqlite":
+        from app.models.learning_progress_log import LearningProgressLog
+
+        table = LearningProgressLog.__table__
+        copied = ", ".join(col.name for col in table.columns if col.name in columns)
+        with engine.begin() as conn:
+            # Index names are schema-wide; drop them so the new table can take them
+            for index in inspector.get_indexes("learning_progress_logs"):
+                conn.execute(text(f'DROP INDEX "{index["name"]}"'))
+            conn.execute(text("ALTER TABLE learning_progress_logs RENAME TO learning_progress_logs_old"))
+            table.create(conn)
+            conn.execute(
+                text(
+                    f"INSERT INTO learning_progress_logs ({copied}) "
+                    f"SELECT {copied} FROM learning_progress_logs_old"
+                )
+            )
+            conn.execute(text("DROP TABLE learning_progress_logs_old"))
+    else:
+        with engine.connect() as conn:
+            conn.execute(text("ALTER TABLE learning_progress_logs MODIFY term_id INT NULL"))
+            conn.commit()
+    logger.success("Made learning_progress_logs.term_id nullable")
+
+
+def ensure_learning_set_stats(engine) -> None:
+    """
+    Backfill learning_set_stats from learning_progress on first run. The
+    table itself is created by create_all; the API keeps it current after that.
+    """
+    inspector = inspect(engine)
+    if "learning_set_stats" not in inspector.get_table_names():
+        logger.warning("learning_set_stats table missing; skipping backfill")
+        return
+
+    with engine.connect() as conn:
+        has_stats = conn.execute(text("SELECT 1 FROM learning_set_stats LIMIT 1")).first()
+        has_progress = conn.execute(text("SELECT 1 FROM learning_progress LIMIT 1")).first()
+    if has_progress and not has_stats:
+        logger.info("Backfilling learning_set_stats")
+        with sessionmaker(bind=engine)() as db:
+            rebuild_set_stats(db)
+            db.commit()
+        logger.success("Backfilled learning_set_stats")
+
+
+def ensure_learning_term_stats(engine) -> None:
+    """
+    Backfill learning_term_stats from learning_progress_logs on first run. The
+    table itself is created by create_all; log writes keep it current after that.
+    """
+    inspector = inspect(engine)
+    if "learning_term_stats" not in inspector.get_table_names():
+        logger.warning("learning_term_stats table missing; skipping backfill")
+        return
+
+    with engine.connect() as conn:
+        has_stats = conn.execute(text("SELECT 1 FROM learning_term_stats LIMIT 1")).first()
+        has_logs = conn.execute(text("SELECT 1 FROM learning_progress_logs LIMIT 1")).first()
+    if has_logs and not has_stats:
+        logger.info("Backfilling learning_term_stats")
+        with sessionmaker(bind=engine)() as db:
+            rebuild_term_stats(db)
+            db.commit()
+        logger.success("Backfilled learning_term_stats")
+
+
+def ensure_index(engine, table: str, name: str, columns: list[str]) -> None:
+    """
+    Create a (non-unique) index if the table exists and has no index of that name.
+    create_all only adds indexes for new tables, so existing deployments need this.
+    """
+    inspector = inspect(engine)
+    if table not in inspector.get_table_names():
+        logger.warning(f"{table} table missing; skipping index {name}")
+        return
+    if name in {idx["name"] for idx in inspector.get_indexes(table)}:
+        return
+
+    logger.info(f"Creating index {name} on {table} ({', '.join(columns)})")
+    with engine.connect() as conn:
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+        conn.commit()
+    logger.success(f"Created index {name}")
+
+
+def ensure_library_indexes(engine) -> None:
+    """
+    Indexes behind the keyset-paginated library: reviewed sets are read newest
+    first from learning_set_stats (user_id, last_reviewed, study_set_id) and
+    authored sets from study_sets (author_id, updated_at). The per-set latest
+    review on learning_progress is read from (user_id, study_set_id,
+    last_reviewed) when a view touches progress.
+    """
+    ensure_index(
+        engine,
+        "learning_progress",
+        "ix_learning_progress_user_set_reviewed",
+        ["user_id", "study_set_id", "last_reviewed"],
+    )
+    ensure_index(
+        engine,
+        "study_sets",
+        "ix_study_sets_author_updated",
+        ["author_id", "updated_at"],
+    )
+    ensure_index(
+        engine,
+        "learning_set_stats",
+        "ix_learning_set_stats_user_reviewed",
+        ["user_id", "last_reviewed", "study_set_id"],
+    )
+
+
+def ensure_learning_progress_user_term_index(engine) -> None:
+    """
+    (user_id, term_id) is how progress rows are looked up when answering and
+    probed when the learning session looks for unstarted terms.
+    """
+    ensure_index(
+        engine,
+        "learning_progress",
+        "ix_learning_progress_user_term",
+        ["user_id", "term_id"],
+    )
+
+
+def ensure_learning_progress_due_indexes(engine) -> None:
+    """
+    Indexes behind the review queue and daily plan: due reviews are a range
+    scan on (user_id, next_review_at) in review order, and familiar terms
+    without a schedule are counted from (user_id, status, next_review_at).
+    """
+    ensure_index(
+        engine,
+        "learning_progress",
+        "ix_learning_progress_user_due",
+        ["user_id", "next_review_at"],
+    )
+    ensure_index(
+        engine,
+        "learning_progress",
+        "ix_learning_progress_user_status_due",
+        ["user_id", "status", "next_review_at"],
+    )
+
+
+def ensure_public_top_index(engine) -> None:
+    """Lets the public leaderboard read the top sets by view_count from an index."""
+    ensure_index(
+        engine,
+        "study_sets",
+        "ix_study_sets_public_views",
+        ["is_public", "view_count"],
+    )
+
+
 def run_migrations(engine) -> None:
     logger.info("Running lightweight migrations...")
     ensure_ai_config_total_tokens(engine)
     ensure_ai_config_token_limit(engine)
     ensure_learning_reports_utf8mb4(engine)
     # daily_learning_summaries is created by Base.metadata.create_all in main.py
+    ensure_daily_learning_summary_unique(engine)
     ensure_learning_progress_mastered_at(engine)
     ensure_ai_usage_logs_extra_fields(engine)
     ensure_learning_progress_srs_fields(engine)
+    ensure_library_indexes(engine)
+    ensure_public_top_index(engine)
+    ensure_learning_progress_user_term_index(engine)
+    ensure_learning_progress_due_indexes(engine)
+    ensure_study_set_terms_revision(engine)
+    ensure_study_set_search_index(engine)
+    ensure_learning_logs_term_id_nullable(engine)
+    ensure_learning_set_stats(engine)
+    ensure_learning_term_stats(engine)
@@ -0,0 +1,90 @@
+import threading
+from time import perf_counter
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+
+class _CheckoutStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+
+class _CheckoutTimingMixin:
+    """
+    Times every checkout (waiting for a free connection, or opening an overflow
+    one) and counts checkouts that hit ``pool_timeout``. Counters survive
+    ``recreate()``, which SQLAlchemy calls on dispose and after a disconnect.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._checkout_stats = _CheckoutStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._checkout_stats = self._checkout_stats
+        return pool
+
+    def _do_get(self):
+        counters = self._checkout_stats
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with counters.lock:
+                counters.timeouts += 1
+            raise
+        finally:
+            wait_ms = (perf_counter() - start) * 1000
+            with counters.lock:
+                counters.checkouts += 1
+                counters.total_wait_ms += wait_ms
+                counters.max_wait_ms = max(counters.max_wait_ms, wait_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        counters = self._checkout_stats
+        with counters.lock:
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self._max_overflow,
+                "timeout_seconds": self._timeout,
+                "recycle_seconds": self._recycle,
+                "pre_ping": self._pre_ping,
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                # Negative while the pool has not yet opened pool_size connections
+                "overflow": self.overflow(),
+                "checkouts": counters.checkouts,
+                "timeouts": counters.timeouts,
+                "avg_wait_ms": round(counters.total_wait_ms / counters.checkouts, 2)
+                if counters.checkouts
+                else 0.0,
+                "max_wait_ms": round(counters.max_wait_ms, 2),
+            }
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options() -> Dict[str, Any]:
+    """create_engine keyword arguments built from the DB_POOL_* settings."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,381 @@
+"""
+Full-text search over study sets.
+
+Every study set has one row in study_set_search_docs holding its title,
+description and all terms/definitions as a single body. The index on top of it
+depends on the database:
+
+* MySQL: InnoDB FULLTEXT indexes using the ngram parser, so Chinese text
+  without spaces is searchable. Results are ranked by MATCH ... AGAINST
+  relevance, with title matches weighted up.
+* SQLite: an external-content FTS5 table with the trigram tokenizer, kept in
+  sync with the docs table by triggers, and ranked by bm25(). Trigrams need
+  at least three characters, so shorter words (most Chinese vocabulary, e.g.
+  "英语") are matched with LIKE on the FTS table instead. That scans the docs
+  table, one row per set rather than per term, and a query made only of
+  short words is ranked by which columns matched.
+
+Both answer a query from the index without scanning terms. Writes to a set
+queue its doc for search_index_writer; reindex_search.py rebuilds or checks
+all docs offline.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from loguru import logger
+from sqlalchemy import delete, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import Session
+
+from app.core.background import BatchWorker
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import upsert
+from app.models.study_set import StudySet, Term
+from app.models.study_set_search_doc import StudySetSearchDoc
+
+FTS_TABLE = "study_set_search_fts"
+# Bound the size of one multi-row upsert; bodies of large sets are big
+REFRESH_CHUNK_SIZE = 100
+# bm25 column weights for title, description and body (SQLite)
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+# Extra weight of a title match in the MySQL relevance score
+TITLE_WEIGHT = 3
+TRIGRAM_MIN_LENGTH = 3
+SEARCH_COLUMNS = ("title", "description", "body")
+
+
+def _mysql_index_statements() -> List[str]:
+    return [
+        "ALTER TABLE study_set_search_docs "
+        "ADD FULLTEXT INDEX ft_study_set_search_title (title) WITH PARSER ngram",
+        "ALTER TABLE study_set_search_docs "
+        "ADD FULLTEXT INDEX ft_study_set_search_all (title, description, body) WITH PARSER ngram",
+    ]
+
+
+def _sqlite_index_statements() -> List[str]:
+    columns = "title, description, body"
+    new_values = "new.title, new.description, new.body"
+    old_values = "old.title, old.description, old.body"
+    return [
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, "
+        "content='study_set_search_docs', content_rowid='study_set_id', tokenize='trigram')",
+        f"CREATE TRIGGER study_set_search_docs_ai AFTER INSERT ON study_set_search_docs BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.study_set_id, {new_values}); END",
+        f"CREATE TRIGGER study_set_search_docs_ad AFTER DELETE ON study_set_search_docs BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.study_set_id, {old_values}); END",
+        f"CREATE TRIGGER study_set_search_docs_au AFTER UPDATE ON study_set_search_docs BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.study_set_id, {old_values}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.study_set_id, {new_values}); END",
+        # Index docs that already exist
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+
+
+def search_index_exists(engine: Engine) -> bool:
+    with engine.connect() as conn:
+        if engine.dialect.name == "mysql":
+            return bool(
+                conn.execute(
+                    text(
+                        "SELECT COUNT(*) FROM information_schema.statistics "
+                        "WHERE table_schema = DATABASE() AND table_name = 'study_set_search_docs' "
+                        "AND index_name = 'ft_study_set_search_all'"
+                    )
+                ).scalar()
+            )
+        if engine.dialect.name == "sqlite":
+            return bool(
+                conn.execute(
+                    text("SELECT COUNT(*) FROM sqlite_master WHERE name = :name"),
+                    {"name": FTS_TABLE},
+                ).scalar()
+            )
+    return False
+
+
+def create_search_index(engine: Engine) -> None:
+    """Create the full-text index on study_set_search_docs for this dialect."""
+    if engine.dialect.name == "mysql":
+        statements = _mysql_index_statements()
+    elif engine.dialect.name == "sqlite":
+        statements = _sqlite_index_statements()
+    else:
+        raise NotImplementedError(f"full-text search is not supported on {engine.dialect.name}")
+    with engine.connect() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+        conn.commit()
+
+
+def build_search_docs(db: Session, study_set_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Search doc rows of the given sets as they should be now, keyed by set id."""
+    sets = db.execute(
+        select(StudySet.id, StudySet.title, StudySet.description).where(StudySet.id.in_(study_set_ids))
+    ).all()
+    term_rows = db.execute(
+        select(Term.study_set_id, Term.term, Term.definition)
+        .where(Term.study_set_id.in_(study_set_ids))
+        .order_by(Term.study_set_id, Term.order, Term.id)
+    ).all()
+    bodies = {
+        study_set_id: "\n".join(f"{row.term} {row.definition}" for row in rows)
+        for study_set_id, rows in groupby(term_rows, key=lambda row: row.study_set_id)
+    }
+    return {
+        row.id: {
+            "study_set_id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "body": bodies.get(row.id, ""),
+        }
+        for row in sets
+    }
+
+
+def rebuild_fts_index(engine: Engine) -> None:
+    """Rebuild the SQLite FTS5 index from the docs table (MySQL keeps its own in step)."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        conn.commit()
+
+
+def refresh_search_docs(db: Session, study_set_ids: Iterable[int]) -> None:
+    """
+    Rebuild the search docs of the given sets from their current rows; ids
+    of deleted sets drop their doc. Does not commit.
+    """
+    ids = sorted(set(study_set_ids))
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        chunk = ids[start:start + REFRESH_CHUNK_SIZE]
+        docs = build_search_docs(db, chunk)
+        missing = set(chunk) - set(docs)
+        if missing:
+            db.execute(delete(StudySetSearchDoc).where(StudySetSearchDoc.study_set_id.in_(missing)))
+        upsert(
+            db,
+            StudySetSearchDoc.__table__,
+            list(docs.values()),
+            conflict_columns=["study_set_id"],
+            update=lambda new: [
+                ("title", new.title),
+                ("description", new.description),
+                ("body", new.body),
+            ],
+        )
+
+
+def _refresh_batch(session_factory: Callable[[], Session], study_set_ids: List[int]) -> int:
+    db = session_factory()
+    try:
+        refresh_search_docs(db, study_set_ids)
+        db.commit()
+        return len(study_set_ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _flush_reindex(study_set_ids: List[int]) -> None:
+    _refresh_batch(SessionLocal, study_set_ids)
+
+
+# Refreshes search docs off the request path, started/stopped by the app
+# lifespan in main.py. Ids are deduplicated per batch by refresh_search_docs.
+search_index_writer = BatchWorker(
+    "search-index-writer",
+    _flush_reindex,
+    max_queue_size=settings.SEARCH_INDEX_QUEUE_SIZE,
+    batch_size=settings.SEARCH_INDEX_BATCH_SIZE,
+    flush_interval_ms=settings.SEARCH_INDEX_FLUSH_INTERVAL_MS,
+)
+
+
+def reindex_study_sets(db: Session, study_set_ids: Iterable[int]) -> None:
+    """
+    Queue the search docs of the given sets for search_index_writer. Call
+    after the write is committed so the worker sees it; ids the queue rejects
+    are refreshed and committed on ``db`` right away.
+    """
+    rejected = [study_set_id for study_set_id in study_set_ids if not search_index_writer.submit(study_set_id)]
+    if rejected:
+        refresh_search_docs(db, rejected)
+        db.commit()
+
+
+def rebuild_search_docs(
+    session_factory: Callable[[], Session],
+    *,
+    batch_size: int = 500,
+    workers: int = 1,
+    study_set_ids: List[int] | None = None,
+) -> int:
+    """
+    Refresh the docs of every study set (or just ``study_set_ids``) in batches
+    of ``batch_size`` sets, ``workers`` batches at a time, each on its own
+    session and committed on its own. A full rebuild also drops orphaned docs.
+    Returns the number of sets refreshed.
+    """
+    db = session_factory()
+    try:
+        if study_set_ids is None:
+            db.execute(
+                delete(StudySetSearchDoc).where(
+                    StudySetSearchDoc.study_set_id.not_in(select(StudySet.id))
+                )
+            )
+            db.commit()
+            study_set_ids = db.execute(select(StudySet.id).order_by(StudySet.id)).scalars().all()
+    finally:
+        db.close()
+
+    batches = [
+        study_set_ids[start:start + batch_size]
+        for start in range(0, len(study_set_ids), max(1, batch_size))
+    ]
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for count in pool.map(lambda batch: _refresh_batch(session_factory, batch), batches):
+            done += count
+            logger.info(f"Reindexed {done}/{len(study_set_ids)} study sets")
+    return done
+
+
+def check_search_docs(db: Session, batch_size: int = 500) -> Dict[str, Any]:
+    """
+    Compare every search doc with the set and terms it was built from. Reports
+    sets without a doc (missing), docs without a set (orphaned), docs that no
+    longer match their set (stale) and, on SQLite, the FTS5 integrity-check
+    error if any.
+    """
+    set_ids = db.execute(select(StudySet.id).order_by(StudySet.id)).scalars().all()
+    doc_ids = set(db.execute(select(StudySetSearchDoc.study_set_id)).scalars().all())
+    missing: List[int] = []
+    stale: List[int] = []
+
+    doc_columns = StudySetSearchDoc.__table__.c
+    for start in range(0, len(set_ids), max(1, batch_size)):
+        chunk = set_ids[start:start + batch_size]
+        expected = build_search_docs(db, chunk)
+        actual = {
+            row.study_set_id: row._asdict()
+            for row in db.execute(
+                select(doc_columns.study_set_id, doc_columns.title, doc_columns.description, doc_columns.body)
+                .where(doc_columns.study_set_id.in_(chunk))
+            )
+        }
+        for study_set_id in chunk:
+            if study_set_id not in actual:
+                missing.append(study_set_id)
+            elif actual[study_set_id] != expected.get(study_set_id):
+                stale.append(study_set_id)
+
+    index_error = None
+    if db.get_bind().dialect.name == "sqlite":
+        try:
+            db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('integrity-check')"))
+        except DatabaseError as e:
+            index_error = str(e.orig)
+        db.rollback()
+
+    orphaned = sorted(doc_ids.difference(set_ids))
+    return {
+        "sets": len(set_ids),
+        "docs": len(doc_ids),
+        "missing": missing,
+        "orphaned": orphaned,
+        "stale": stale,
+        "index_error": index_error,
+        "ok": not (missing or orphaned or stale or index_error),
+    }
+
+
+def _fts5_query(words: List[str]) -> str | None:
+    """Quote each word as an FTS5 phrase so user input is never parsed as syntax."""
+    if not words:
+        return None
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def _like_pattern(word: str) -> str:
+    escaped = word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _sqlite_search(query: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    FTS5 statement and parameters for ``query``: words of three or more
+    characters go through the trigram index with MATCH, shorter ones are
+    each required with LIKE on the FTS table.
+    """
+    words = query.split()
+    fts_query = _fts5_query([word for word in words if len(word) >= TRIGRAM_MIN_LENGTH])
+    params: Dict[str, Any] = {}
+    conditions = ["s.is_public = 1"]
+    if fts_query is not None:
+        conditions.append(f"{FTS_TABLE} MATCH :q")
+        params["q"] = fts_query
+    short_words = [word for word in words if len(word) < TRIGRAM_MIN_LENGTH]
+    for idx, word in enumerate(short_words):
+        name = f"w{idx}"
+        params[name] = _like_pattern(word)
+        conditions.append(
+            "(" + " OR ".join(f"f.{column} LIKE :{name} ESCAPE '\\'" for column in SEARCH_COLUMNS) + ")"
+        )
+
+    if fts_query is not None:
+        weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+        # bm25() is lower for better matches; negate it so higher is better
+        score = f"-bm25({FTS_TABLE}, {weights})"
+    else:
+        # No MATCH, so no bm25(): score by the columns the first word is found in
+        score = " + ".join(
+            f"(CASE WHEN f.{column} LIKE :w0 ESCAPE '\\' THEN {weight} ELSE 0 END)"
+            for column, weight in zip(SEARCH_COLUMNS, BM25_WEIGHTS)
+        )
+    statement = (
+        f"SELECT f.rowid AS study_set_id, {score} AS score "
+        f"FROM {FTS_TABLE} f "
+        "JOIN study_sets s ON s.id = f.rowid "
+        f"WHERE {' AND '.join(conditions)} "
+        "ORDER BY score DESC, f.rowid DESC "
+        "LIMIT :limit OFFSET :skip"
+    )
+    return statement, params
+
+
+def search_public_study_set_ids(db: Session, query: str, skip: int, limit: int) -> List[Tuple[int, float]]:
+    """``(study_set_id, score)`` of public sets matching ``query``, best first."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = text(
+            "SELECT d.study_set_id, "
+            f"MATCH(d.title) AGAINST (:q IN NATURAL LANGUAGE MODE) * {TITLE_WEIGHT} "
+            "+ MATCH(d.title, d.description, d.body) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score "
+            "FROM study_set_search_docs d "
+            "JOIN study_sets s ON s.id = d.study_set_id "
+            "WHERE MATCH(d.title, d.description, d.body) AGAINST (:q IN NATURAL LANGUAGE MODE) "
+            "AND s.is_public = 1 "
+            "ORDER BY score DESC, d.study_set_id DESC "
+            "LIMIT :limit OFFSET :skip"
+        )
+        params = {"q": query}
+    elif dialect == "sqlite":
+        if not query.split():
+            return []
+        sql, params = _sqlite_search(query)
+        statement = text(sql)
+    else:
+        raise NotImplementedError(f"full-text search is not supported on {dialect}")
+
+    rows = db.execute(statement, {**params, "limit": limit, "skip": skip}).all()
+    return [(row.study_set_id, float(row.score)) for row in rows]
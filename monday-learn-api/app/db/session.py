@@ -1,34 +1,91 @@
+from typing import Any, Callable, TypeVar, Union
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.concurrency import run_in_threadpool
 from loguru import logger
 from time import perf_counter
 from app.core.config import APP_ENV
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_options
+
+T = TypeVar("T")
 
 # Enable SQL echo/monitoring in dev to print all executed statements with timing
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
+    poolclass=InstrumentedQueuePool,
+    **pool_options(),
     echo=APP_ENV == "dev",
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional async engine (aiomysql/asyncmy, or aiosqlite via ASYNC_DATABASE_URL)
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB_ENABLED:
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+        poolclass=InstrumentedAsyncQueuePool,
+        **pool_options(),
+        echo=APP_ENV == "dev",
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=True
+    )
+
 # When running in dev, log every SQL statement and execution time
 if APP_ENV == "dev":
-    @event.listens_for(engine, "before_cursor_execute")
     def _query_start(conn, cursor, statement, parameters, context, executemany):
         conn.info.setdefault("query_start_time", []).append(perf_counter())
         logger.info(f"SQL START: {statement}; params={parameters}")
 
-    @event.listens_for(engine, "after_cursor_execute")
     def _query_end(conn, cursor, statement, parameters, context, executemany):
         start = conn.info.get("query_start_time", []).pop(-1)
         duration_ms = (perf_counter() - start) * 1000
         logger.info(f"SQL END  : {statement}; params={parameters}; duration={duration_ms:.2f}ms")
 
+    for _engine in filter(None, [engine, async_engine and async_engine.sync_engine]):
+        event.listen(_engine, "before_cursor_execute", _query_start)
+        event.listen(_engine, "after_cursor_execute", _query_end)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+class ThreadedSession:
+    """
+    Sync Session behind AsyncSession's ``run_sync`` calling convention, used by
+    get_async_db when the async engine is disabled.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+AsyncDB = Union[AsyncSession, ThreadedSession]
+
+
+async def get_async_db():
+    """
+    Session for async endpoints. Handlers pass their sync query code to
+    ``await db.run_sync(fn, *args)``: on the async engine it runs on the event
+    loop without blocking on I/O, otherwise in the thread pool as before.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    db = SessionLocal()
+    try:
+        yield ThreadedSession(db)
+    finally:
+        await run_in_threadpool(db.close)
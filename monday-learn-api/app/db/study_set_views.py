@@ -0,0 +1,185 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import bindparam, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.background import BatchWorker
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.learning_stats import bump_set_stats, status_change
+from app.db.session import SessionLocal
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.study_set import StudySet, Term
+
+# (study_set_id, user_id or None, viewed_at)
+ViewEvent = Tuple[int, int | None, datetime]
+
+# (user_id, study_set_id) pairs whose progress was touched recently
+recent_touches = TTLCache(
+    maxsize=50000,
+    ttl=max(1, settings.STUDY_SET_TOUCH_INTERVAL_SECONDS),
+)
+
+
+def bump_view_counts(db: Session, counts: Dict[int, int]) -> None:
+    """
+    Add per-set view counts with one executemany UPDATE. updated_at is kept
+    as is, since a view is not an edit (and it feeds the detail ETag). Does
+    not commit.
+    """
+    if not counts:
+        return
+    table = StudySet.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            view_count=table.c.view_count + bindparam("b_views"),
+            updated_at=table.c.updated_at,
+        ),
+        [{"b_id": study_set_id, "b_views": views} for study_set_id, views in counts.items()],
+    )
+
+
+def _latest_progress_ids(db: Session, pairs: List[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+    """Most recently reviewed progress row per (user_id, study_set_id), in one query."""
+    rank = (
+        func.row_number()
+        .over(
+            partition_by=(LearningProgress.user_id, LearningProgress.study_set_id),
+            order_by=(LearningProgress.last_reviewed.desc(), LearningProgress.id.desc()),
+        )
+        .label("rank")
+    )
+    ranked = (
+        select(LearningProgress.id, LearningProgress.user_id, LearningProgress.study_set_id, rank)
+        .where(tuple_(LearningProgress.user_id, LearningProgress.study_set_id).in_(pairs))
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked.c.user_id, ranked.c.study_set_id, ranked.c.id).where(ranked.c.rank == 1)
+    )
+    return {(user_id, study_set_id): progress_id for user_id, study_set_id, progress_id in rows}
+
+
+def _first_term_ids(db: Session, study_set_ids: Set[int]) -> Dict[int, int]:
+    """First term (by order, then id) of each set, in one query; empty sets are left out."""
+    rank = (
+        func.row_number()
+        .over(partition_by=Term.study_set_id, order_by=(Term.order, Term.id))
+        .label("rank")
+    )
+    ranked = (
+        select(Term.id, Term.study_set_id, rank)
+        .where(Term.study_set_id.in_(study_set_ids))
+        .subquery()
+    )
+    rows = db.execute(select(ranked.c.study_set_id, ranked.c.id).where(ranked.c.rank == 1))
+    return {study_set_id: term_id for study_set_id, term_id in rows}
+
+
+def touch_progress(db: Session, touches: Dict[Tuple[int, int], datetime]) -> None:
+    """
+    Mark sets as recently opened by moving the user's most recent progress row
+    to ``viewed_at``, or starting progress on the first term if there is none,
+    so the library lists them by activity. A constant number of statements
+    however many pairs are touched. Does not commit.
+    """
+    if not touches:
+        return
+    latest = _latest_progress_ids(db, list(touches))
+    changes = []
+    if latest:
+        table = LearningProgress.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(last_reviewed=bindparam("b_viewed_at")),
+            [{"b_id": progress_id, "b_viewed_at": touches[pair]} for pair, progress_id in latest.items()],
+        )
+        changes.extend(
+            status_change(user_id, study_set_id, None, None, touches[(user_id, study_set_id)])
+            for user_id, study_set_id in latest
+        )
+
+    missing = [pair for pair in touches if pair not in latest]
+    first_terms = _first_term_ids(db, {study_set_id for _, study_set_id in missing}) if missing else {}
+    rows = []
+    for user_id, study_set_id in missing:
+        term_id = first_terms.get(study_set_id)
+        if term_id is None:
+            continue
+        viewed_at = touches[(user_id, study_set_id)]
+        rows.append(
+            {
+                "user_id": user_id,
+                "study_set_id": study_set_id,
+                "term_id": term_id,
+                "status": LearningStatus.NOT_STARTED,
+                "last_reviewed": viewed_at,
+            }
+        )
+        changes.append(status_change(user_id, study_set_id, None, LearningStatus.NOT_STARTED, viewed_at))
+    if rows:
+        db.execute(insert(LearningProgress.__table__).values(rows))
+    bump_set_stats(db, changes)
+
+
+def apply_views(db: Session, events: List[ViewEvent]) -> None:
+    """Fold view events into view counts and coalesced progress touches. Does not commit."""
+    counts = Counter(study_set_id for study_set_id, _, _ in events)
+    touches: Dict[Tuple[int, int], datetime] = {}
+    for study_set_id, user_id, viewed_at in events:
+        if user_id is not None:
+            key = (user_id, study_set_id)
+            touches[key] = max(viewed_at, touches.get(key, viewed_at))
+    bump_view_counts(db, counts)
+    touch_progress(db, touches)
+    db.flush()
+
+
+def record_view(db: Session, study_set_id: int, user_id: int | None) -> bool:
+    """
+    Count a view of a study set and, at most once per
+    STUDY_SET_TOUCH_INTERVAL_SECONDS per user and set, touch the user's
+    progress. Both are buffered for study_set_view_writer; returns True when
+    the buffer was full and they were applied on ``db`` instead, in which case
+    the caller must commit.
+    """
+    touch_user_id = None
+    if user_id is not None and settings.STUDY_SET_TOUCH_INTERVAL_SECONDS > 0:
+        key = (user_id, study_set_id)
+        if recent_touches.get(key) is None:
+            recent_touches.set(key, True)
+            touch_user_id = user_id
+
+    event: ViewEvent = (study_set_id, touch_user_id, datetime.now())
+    if study_set_view_writer.submit(event):
+        return False
+    apply_views(db, [event])
+    return True
+
+
+def _flush_views(events: List[ViewEvent]) -> None:
+    db = SessionLocal()
+    try:
+        apply_views(db, events)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# Buffer for view counts and progress touches, started/stopped by the app
+# lifespan in main.py. A full queue or stopped worker makes callers write inline.
+study_set_view_writer = BatchWorker(
+    "study-set-view-writer",
+    _flush_views,
+    max_queue_size=settings.STUDY_SET_VIEW_QUEUE_SIZE,
+    batch_size=settings.STUDY_SET_VIEW_BATCH_SIZE,
+    flush_interval_ms=settings.STUDY_SET_VIEW_FLUSH_INTERVAL_MS,
+)
@@ -0,0 +1,45 @@
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def upsert(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    *,
+    conflict_columns: Sequence[str],
+    update: Callable[[Any], List[Tuple[str, Any]]],
+) -> None:
+    """
+    Single-statement INSERT that updates the existing row on a key conflict.
+
+    Uses ``ON DUPLICATE KEY UPDATE`` on MySQL and ``ON CONFLICT DO UPDATE`` on
+    SQLite/PostgreSQL. ``update`` receives the proposed row (``inserted`` /
+    ``excluded``) and returns ordered ``(column, expression)`` pairs; current
+    values are referenced through ``table.c``. MySQL applies the assignments left
+    to right, so a column whose expression reads another updated column must be
+    listed before that column.
+    """
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql_insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(update(stmt.inserted))
+    elif dialect in ("sqlite", "postgresql"):
+        insert_fn = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = insert_fn(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_=dict(update(stmt.excluded)),
+        )
+    else:
+        raise NotImplementedError(f"upsert is not supported on {dialect}")
+
+    db.execute(stmt)
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy import Column, Integer, Date, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class DailyLearningSummary(Base):
     __tablename__ = "daily_learning_summaries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", name="uq_daily_learning_summaries_user_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
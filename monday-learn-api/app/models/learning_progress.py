@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -13,6 +13,17 @@ class LearningStatus(str, enum.Enum):
 
 class LearningProgress(Base):
     __tablename__ = "learning_progress"
+    __table_args__ = (
+        Index(
+            "ix_learning_progress_user_set_reviewed",
+            "user_id",
+            "study_set_id",
+            "last_reviewed",
+        ),
+        Index("ix_learning_progress_user_term", "user_id", "term_id"),
+        Index("ix_learning_progress_user_due", "user_id", "next_review_at"),
+        Index("ix_learning_progress_user_status_due", "user_id", "status", "next_review_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
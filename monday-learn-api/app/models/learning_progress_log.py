@@ -10,7 +10,8 @@ class LearningProgressLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     study_set_id = Column(Integer, ForeignKey("study_sets.id"), nullable=False, index=True)
-    term_id = Column(Integer, ForeignKey("terms.id"), nullable=False, index=True)
+    # NULL once the term is removed from its set; the answer itself is kept
+    term_id = Column(Integer, ForeignKey("terms.id"), nullable=True, index=True)
 
     mode = Column(String(20), nullable=False)  # learn | test | review
     question_type = Column(String(50), nullable=True)  # mc, written, flashcard, true_false, etc.
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.db.base import Base
+
+
+class LearningSetStats(Base):
+    """
+    Per-user, per-set counters over learning_progress: how many of the user's
+    progress rows in the set are in each status, and the latest review.
+    Maintained by app.db.learning_stats alongside every progress write.
+    """
+    __tablename__ = "learning_set_stats"
+    __table_args__ = (
+        # The library's recently-reviewed stream, newest first
+        Index("ix_learning_set_stats_user_reviewed", "user_id", "last_reviewed", "study_set_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    study_set_id = Column(Integer, ForeignKey("study_sets.id"), primary_key=True, index=True)
+    not_started = Column(Integer, default=0, nullable=False)
+    familiar = Column(Integer, default=0, nullable=False)
+    mastered = Column(Integer, default=0, nullable=False)
+    last_reviewed = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.db.base import Base
+
+
+class LearningTermStats(Base):
+    """
+    Per-user, per-term answer counters over learning_progress_logs, folded in
+    by app.db.learning_logs as logs are written. Backs the weak-terms ranking.
+    """
+    __tablename__ = "learning_term_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    term_id = Column(Integer, ForeignKey("terms.id"), primary_key=True)
+    study_set_id = Column(Integer, ForeignKey("study_sets.id"), nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    errors = Column(Integer, default=0, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -6,6 +6,10 @@ from app.db.base import Base
 
 class StudySet(Base):
     __tablename__ = "study_sets"
+    __table_args__ = (
+        Index("ix_study_sets_author_updated", "author_id", "updated_at"),
+        Index("ix_study_sets_public_views", "is_public", "view_count"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -13,6 +17,8 @@ class StudySet(Base):
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     is_public = Column(Boolean, default=True, nullable=False)
     view_count = Column(Integer, default=0, nullable=False)
+    # Bumped whenever the set's terms change; part of the detail ETag
+    terms_revision = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
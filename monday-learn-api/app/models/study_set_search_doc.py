@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class StudySetSearchDoc(Base):
+    """
+    Denormalized text of one study set (title, description and every
+    term/definition) that the full-text index is built on. Maintained by
+    app.db.search; never edited directly.
+    """
+    __tablename__ = "study_set_search_docs"
+
+    study_set_id = Column(Integer, ForeignKey("study_sets.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(String(255), nullable=False)
+    description = Column(String(500), nullable=True)
+    # Large sets exceed MySQL TEXT's 64KB
+    body = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False, default="")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
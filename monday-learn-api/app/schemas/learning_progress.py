@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -30,6 +30,14 @@ class LearningProgressUpdate(BaseModel):
     source: Optional[str] = None
 
 
+class LearningProgressBatchItem(LearningProgressUpdate):
+    term_id: int
+
+
+class LearningProgressBatchUpdate(BaseModel):
+    answers: List[LearningProgressBatchItem] = Field(..., min_length=1, max_length=100)
+
+
 class LearningProgressResponse(LearningProgressBase):
     id: int
     term_id: int
@@ -19,7 +19,7 @@ class LearningProgressLogCreate(LearningProgressLogBase):
 
 
 class LearningProgressLogResponse(LearningProgressLogBase):
-    id: int
+    id: Optional[int] = None  # None while the log is still buffered for write-behind
     user_id: int
     study_set_id: int
     term_id: int
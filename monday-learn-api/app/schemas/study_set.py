@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
+# "summary" list responses carry term_count but an empty terms list
+StudySetFields = Literal["full", "summary"]
+
 
 class TermBase(BaseModel):
     term: str = Field(..., min_length=1, max_length=255)
@@ -33,8 +36,13 @@ class StudySetCreate(StudySetBase):
     terms: List[TermCreate] = Field(default_factory=list)
 
 
+class TermUpdate(TermBase):
+    # Id of the existing term this entry edits; omitted for new terms
+    id: Optional[int] = None
+
+
 class StudySetUpdate(StudySetBase):
-    terms: List[TermCreate] = Field(default_factory=list)
+    terms: List[TermUpdate] = Field(default_factory=list)
 
 
 class StudySetResponse(StudySetBase):
@@ -54,6 +62,28 @@ class StudySetResponse(StudySetBase):
         from_attributes = True
 
 
+class StudySetPage(BaseModel):
+    items: List[StudySetResponse]
+    # Opaque cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+TermImportDelimiter = Literal["auto", "tab", "comma", "semicolon"]
+
+
+class TermImportError(BaseModel):
+    line: int
+    message: str
+
+
+class TermImportResult(BaseModel):
+    imported: int
+    skipped: int
+    term_count: int
+    # First errors only; skipped has the full count
+    errors: List[TermImportError] = Field(default_factory=list)
+
+
 class StudySetCloneRequest(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -0,0 +1,129 @@
+"""
+Due-review queries: seed a large learning_progress table (many users, one of
+them with a long history) and time /learning/review-queue and
+/learning/daily-plan for that user, printing the query plan of every
+learning_progress statement. Run once with the due indexes and once without
+them (--drop-indexes) to compare.
+
+    python -m benchmarks.bench_due_queries --rows 1000000
+    python -m benchmarks.bench_due_queries --rows 1000000 --drop-indexes
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.api.endpoints.learning import daily_plan_cache
+from app.core.config import settings
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.study_set import StudySet, Term
+from app.models.user import User
+from benchmarks.common import QueryCounter, auth_headers, build_app, create_sqlite_engine, summarize_ms
+
+DUE_INDEXES = ["ix_learning_progress_user_due", "ix_learning_progress_user_status_due"]
+STATUSES = [LearningStatus.NOT_STARTED, LearningStatus.FAMILIAR, LearningStatus.MASTERED]
+ENDPOINTS = ["/learning/review-queue", "/learning/daily-plan"]
+CHUNK = 50000
+
+
+def seed(SessionLocal, rows: int, users: int, history: int, rng: random.Random) -> None:
+    """
+    ``users`` users share ``rows`` progress rows; user0 (id 1), the one
+    measured, owns ``history`` of them, spread over its own sets of 100 terms.
+    """
+    db = SessionLocal()
+    db.execute(
+        insert(User.__table__),
+        [
+            {"id": i + 1, "email": f"u{i}@example.com", "username": f"user{i}", "hashed_password": "x", "role": "student"}
+            for i in range(users)
+        ],
+    )
+    set_count = max(1, rows // 100)
+    db.execute(
+        insert(StudySet.__table__),
+        [{"id": i + 1, "title": f"Set {i}", "author_id": 1 if i * 100 < history else (i % users) + 1} for i in range(set_count)],
+    )
+    for start in range(0, set_count * 100, CHUNK):
+        db.execute(
+            insert(Term.__table__),
+            [
+                {"id": i + 1, "study_set_id": i // 100 + 1, "term": f"t{i}", "definition": "d", "order": i % 100}
+                for i in range(start, min(set_count * 100, start + CHUNK))
+            ],
+        )
+    now = datetime.now()
+    for start in range(0, rows, CHUNK):
+        batch = []
+        for i in range(start, min(rows, start + CHUNK)):
+            status = rng.choice(STATUSES)
+            batch.append(
+                {
+                    "user_id": 1 if i < history else rng.randint(2, users),
+                    "study_set_id": i // 100 + 1,
+                    "term_id": i + 1,
+                    "status": status,
+                    # A few legacy familiar rows were never scheduled
+                    "next_review_at": None
+                    if status == LearningStatus.FAMILIAR and rng.random() < 0.1
+                    else now + timedelta(hours=rng.randint(-24 * 30, 24 * 30)),
+                }
+            )
+        db.execute(insert(LearningProgress.__table__), batch)
+        db.commit()
+    db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=50000, help="progress rows of the measured user")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--drop-indexes", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    start = perf_counter()
+    seed(SessionLocal, args.rows, args.users, args.history, rng)
+    print(f"seeded {args.rows} progress rows ({args.history} for the measured user) in {perf_counter() - start:.1f}s")
+
+    with engine.connect() as conn:
+        if args.drop_indexes:
+            for name in DUE_INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+    client = TestClient(app)
+    headers = auth_headers("user0")
+    for path in ENDPOINTS:
+        url = f"{settings.API_V1_STR}{path}"
+        client.get(url, headers=headers).raise_for_status()
+        samples = []
+        for _ in range(args.requests):
+            # Measure the queries, not the per-user daily plan cache
+            daily_plan_cache.clear()
+            with QueryCounter(engine) as counter:
+                start = perf_counter()
+                client.get(url, headers=headers).raise_for_status()
+                samples.append((perf_counter() - start) * 1000)
+        print(f"\n{path}: {summarize_ms(samples)}")
+
+        with engine.connect() as conn:
+            for statement, parameters in zip(counter.statements, counter.parameters):
+                if "learning_progress" not in statement:
+                    continue
+                plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                print("  " + " ".join(statement.split())[:110])
+                for row in plan:
+                    print(f"    {row[-1]}")
+
+
+if __name__ == "__main__":
+    main()
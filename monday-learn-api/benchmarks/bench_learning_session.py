@@ -0,0 +1,98 @@
+"""
+Learning session: grow one study set with progress on most terms and time
+GET /learning/{id}/session. Priorities are scored and ranked in SQL and only
+one batch of candidates is fetched, so latency follows the index scan over
+the set rather than thousands of Python objects per request.
+
+    python -m benchmarks.bench_learning_session --sizes 100 1000 5000 20000
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.study_set import StudySet, Term
+from app.models.user import User
+from benchmarks.common import QueryCounter, auth_headers, build_app, create_sqlite_engine, summarize_ms
+
+STATUSES = [LearningStatus.FAMILIAR, LearningStatus.MASTERED, LearningStatus.NOT_STARTED]
+
+
+def grow_set(SessionLocal, user_id: int, study_set_id: int, start: int, stop: int, rng: random.Random) -> None:
+    """Add terms [start, stop), with progress on three quarters of them."""
+    db = SessionLocal()
+    now = datetime.now()
+    db.execute(
+        insert(Term.__table__),
+        [
+            {"id": i + 1, "study_set_id": study_set_id, "term": f"term {i}", "definition": f"definition {i}", "order": i}
+            for i in range(start, stop)
+        ],
+    )
+    db.execute(
+        insert(LearningProgress.__table__),
+        [
+            {
+                "user_id": user_id,
+                "study_set_id": study_set_id,
+                "term_id": i + 1,
+                "status": rng.choice(STATUSES),
+                "total_correct": rng.randint(0, 10),
+                "total_incorrect": rng.randint(0, 10),
+                "easiness_factor": rng.uniform(1.3, 2.5),
+                "last_reviewed": now - timedelta(hours=rng.randint(1, 500)),
+                "next_review_at": now + timedelta(hours=rng.randint(-300, 200)),
+            }
+            for i in range(start, stop)
+            if i % 4
+        ],
+    )
+    db.commit()
+    db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    db = SessionLocal()
+    user = User(email="session@example.com", username="session", hashed_password="x", role="student")
+    db.add(user)
+    db.flush()
+    study_set = StudySet(title="Session set", author_id=user.id, is_public=True)
+    db.add(study_set)
+    db.commit()
+    user_id, study_set_id = user.id, study_set.id
+    db.close()
+
+    client = TestClient(app)
+    headers = auth_headers("session")
+    url = f"{settings.API_V1_STR}/learning/{study_set_id}/session"
+    client.get(url, headers=headers).raise_for_status()
+
+    size = 0
+    for target in sorted(args.sizes):
+        grow_set(SessionLocal, user_id, study_set_id, size, target, rng)
+        size = target
+        samples = []
+        for _ in range(args.requests):
+            with QueryCounter(engine) as counter:
+                start = perf_counter()
+                resp = client.get(url, headers=headers)
+                samples.append((perf_counter() - start) * 1000)
+            resp.raise_for_status()
+        print(f"{size:>6} terms: {summarize_ms(samples)}, {counter.count} queries, {len(resp.json()['terms'])} terms/batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Library query count: grow one user's library and count the statements issued by
+/study-sets/library, /study-sets and /study-sets/public/top. Progress for every
+set comes from one grouped query, so the count stays flat as the library grows
+(selectinload still adds one terms/authors query per 500 sets). fields=summary
+skips loading terms altogether. /study-sets/library/page merges index-ordered
+streams, so its time stays flat as well.
+
+    python -m benchmarks.bench_library_queries --sizes 10 100 1000 3000
+"""
+import argparse
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.learning_stats import rebuild_set_stats
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.study_set import StudySet, Term
+from app.models.user import User
+from benchmarks.common import QueryCounter, auth_headers, build_app, create_sqlite_engine
+
+TERMS_PER_SET = 5
+ENDPOINTS = [
+    "/study-sets/library",
+    "/study-sets/library?fields=summary",
+    "/study-sets?limit=50",
+    "/study-sets/public/top",
+    "/study-sets/library/page?limit=50&fields=summary",
+]
+
+
+def grow_library(SessionLocal, user_id: int, start: int, stop: int) -> None:
+    """Add sets [start, stop) with a few terms each and progress on half of them."""
+    db = SessionLocal()
+    now = datetime.now()
+    db.execute(
+        insert(StudySet.__table__),
+        [
+            {
+                "id": i + 1,
+                "title": f"Set {i}",
+                "author_id": user_id,
+                "is_public": True,
+                "view_count": i,
+            }
+            for i in range(start, stop)
+        ],
+    )
+    db.execute(
+        insert(Term.__table__),
+        [
+            {
+                "id": i * TERMS_PER_SET + j + 1,
+                "study_set_id": i + 1,
+                "term": f"term {i}.{j}",
+                "definition": f"definition {i}.{j}",
+                "order": j,
+            }
+            for i in range(start, stop)
+            for j in range(TERMS_PER_SET)
+        ],
+    )
+    db.execute(
+        insert(LearningProgress.__table__),
+        [
+            {
+                "user_id": user_id,
+                "study_set_id": i + 1,
+                "term_id": i * TERMS_PER_SET + j + 1,
+                "status": LearningStatus.MASTERED if j % 2 else LearningStatus.FAMILIAR,
+                "last_reviewed": now - timedelta(minutes=i),
+            }
+            for i in range(start, stop, 2)
+            for j in range(TERMS_PER_SET)
+        ],
+    )
+    rebuild_set_stats(db, user_id=user_id)
+    db.commit()
+    db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 3000])
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    db = SessionLocal()
+    user = User(email="library@example.com", username="library", hashed_password="x", role="student")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    client = TestClient(app)
+    headers = auth_headers("library")
+    # Warm the user cache so the counts only cover the endpoint itself
+    client.get(f"{settings.API_V1_STR}/study-sets", headers=headers).raise_for_status()
+
+    print(f"{'sets':>6}  " + "  ".join(f"{path:>48}" for path in ENDPOINTS))
+    size = 0
+    for target in sorted(args.sizes):
+        grow_library(SessionLocal, user_id, size, target)
+        size = target
+        cells = []
+        for path in ENDPOINTS:
+            with QueryCounter(engine) as counter:
+                start = perf_counter()
+                resp = client.get(f"{settings.API_V1_STR}{path}", headers=headers)
+                elapsed_ms = (perf_counter() - start) * 1000
+            resp.raise_for_status()
+            cells.append(f"{counter.count:>3} queries {elapsed_ms:>8.1f}ms")
+        print(f"{size:>6}  " + "  ".join(f"{cell:>48}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Login storm: fire N concurrent logins and probe /health while they are in
+flight. With bcrypt and the login queries off the event loop, health checks
+keep answering in a few milliseconds instead of queueing behind every hash.
+
+    python -m benchmarks.bench_login_storm --logins 100
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import get_password_hash, password_hash_limiter
+from app.models.user import User
+from benchmarks.common import build_app, create_sqlite_engine, summarize_ms
+
+PASSWORD = "benchmark-password"
+
+
+def seed_users(SessionLocal, count: int) -> None:
+    # One hash shared by every account keeps setup fast
+    hashed = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    db.add_all(
+        User(
+            email=f"storm{i}@example.com",
+            username=f"storm{i}",
+            hashed_password=hashed,
+            role="student",
+        )
+        for i in range(count)
+    )
+    db.commit()
+    db.close()
+
+
+async def run(logins: int, probe_interval: float) -> None:
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    seed_users(SessionLocal, logins)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login_ms = []
+        health_ms = []
+
+        async def login(i: int) -> None:
+            start = perf_counter()
+            resp = await client.post(
+                f"{settings.API_V1_STR}/auth/login",
+                data={"username": f"storm{i}", "password": PASSWORD},
+            )
+            resp.raise_for_status()
+            login_ms.append((perf_counter() - start) * 1000)
+
+        async def probe(done: asyncio.Event) -> None:
+            while not done.is_set():
+                start = perf_counter()
+                resp = await client.get(f"{settings.API_V1_STR}/health")
+                resp.raise_for_status()
+                health_ms.append((perf_counter() - start) * 1000)
+                await asyncio.sleep(probe_interval)
+
+        done = asyncio.Event()
+        probe_task = asyncio.create_task(probe(done))
+        start = perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        wall = perf_counter() - start
+        done.set()
+        await probe_task
+
+    print(f"hash concurrency : {password_hash_limiter.total_tokens}")
+    print(f"logins           : {logins} in {wall:.2f}s ({logins / wall:.1f}/s)")
+    print(f"login latency    : {summarize_ms(login_ms)}")
+    print(f"health latency   : {summarize_ms(health_ms)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument(
+        "--hash-concurrency",
+        type=int,
+        default=None,
+        help="override PASSWORD_HASH_CONCURRENCY for this run",
+    )
+    args = parser.parse_args()
+    if args.hash_concurrency:
+        password_hash_limiter.total_tokens = args.hash_concurrency
+    asyncio.run(run(args.logins, args.probe_interval))
+
+
+if __name__ == "__main__":
+    main()
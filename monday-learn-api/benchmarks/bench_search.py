@@ -0,0 +1,144 @@
+"""
+Study set search: seed a large corpus of public sets, build the full-text index
+and time GET /study-sets/search against the LIKE '%word%' scan over terms that
+it replaces. On SQLite the index is FTS5 (trigram); MySQL uses FULLTEXT ngram.
+
+    python -m benchmarks.bench_search --terms 1000000 --terms-per-set 100
+"""
+import argparse
+import random
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, or_, select
+
+from app.core.config import settings
+from app.db.migrations import ensure_study_set_search_index
+from app.models.study_set import StudySet, Term
+from app.models.user import User
+from benchmarks.common import QueryCounter, auth_headers, build_app, create_sqlite_engine, summarize_ms
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "ten", "vos", "qui", "zel", "dor", "pha", "syn", "the", "gra", "mol"]
+HANZI = "光合作用细胞分裂能量植物动物蛋白质遗传基因水分子结构"
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    words = set()
+    while len(words) < size:
+        if rng.random() < 0.2:
+            words.add("".join(rng.choices(HANZI, k=rng.randint(3, 5))))
+        else:
+            words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def seed(SessionLocal, user_id: int, total_terms: int, terms_per_set: int, vocabulary, rng: random.Random) -> int:
+    set_count = max(1, total_terms // terms_per_set)
+    db = SessionLocal()
+    for start in range(0, set_count, 1000):
+        stop = min(set_count, start + 1000)
+        db.execute(
+            insert(StudySet.__table__),
+            [
+                {
+                    "id": i + 1,
+                    "title": " ".join(rng.choices(vocabulary, k=3)),
+                    "description": " ".join(rng.choices(vocabulary, k=8)),
+                    "author_id": user_id,
+                    "is_public": True,
+                }
+                for i in range(start, stop)
+            ],
+        )
+        db.execute(
+            insert(Term.__table__),
+            [
+                {
+                    "study_set_id": i + 1,
+                    "term": " ".join(rng.choices(vocabulary, k=2)),
+                    "definition": " ".join(rng.choices(vocabulary, k=6)),
+                    "order": j,
+                }
+                for i in range(start, stop)
+                for j in range(terms_per_set)
+            ],
+        )
+        db.commit()
+    db.close()
+    return set_count
+
+
+def like_scan(SessionLocal, word: str, limit: int):
+    """The query search replaces: substring match on every term of every public set."""
+    db = SessionLocal()
+    pattern = f"%{word}%"
+    matching = select(Term.study_set_id).where(
+        or_(Term.term.like(pattern), Term.definition.like(pattern))
+    )
+    ids = db.execute(
+        select(StudySet.id)
+        .where(
+            StudySet.is_public.is_(True),
+            or_(StudySet.title.like(pattern), StudySet.id.in_(matching)),
+        )
+        .limit(limit)
+    ).scalars().all()
+    db.close()
+    return ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, default=1_000_000)
+    parser.add_argument("--terms-per-set", type=int, default=100)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--like-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    db = SessionLocal()
+    user = User(email="search@example.com", username="search", hashed_password="x", role="student")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    start = perf_counter()
+    set_count = seed(SessionLocal, user_id, args.terms, args.terms_per_set, vocabulary, rng)
+    print(f"seeded           : {set_count} sets / {set_count * args.terms_per_set} terms in {perf_counter() - start:.1f}s")
+
+    start = perf_counter()
+    ensure_study_set_search_index(engine)
+    print(f"index build      : {perf_counter() - start:.1f}s")
+
+    client = TestClient(app)
+    headers = auth_headers("search")
+    url = f"{settings.API_V1_STR}/study-sets/search"
+    client.get(url, params={"q": vocabulary[0]}, headers=headers).raise_for_status()
+
+    words = rng.sample(vocabulary, args.queries)
+    samples = []
+    hits = 0
+    for word in words:
+        with QueryCounter(engine) as counter:
+            start = perf_counter()
+            resp = client.get(url, params={"q": word, "limit": 20}, headers=headers)
+            samples.append((perf_counter() - start) * 1000)
+        resp.raise_for_status()
+        hits += bool(resp.json())
+    print(f"search endpoint  : {summarize_ms(samples)}, {counter.count} queries/request, {hits}/{len(words)} with results")
+
+    samples = []
+    for word in words[:args.like_queries]:
+        start = perf_counter()
+        like_scan(SessionLocal, word, 20)
+        samples.append((perf_counter() - start) * 1000)
+    print(f"LIKE '%word%' scan: {summarize_ms(samples)} (ids only, unranked)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Smart recommendations: grow one user's library (authored sets, half of them
+started) and the public catalogue, and time GET /learning/smart-recommend.
+Term counts come from one grouped COUNT and the popular pool is shared, so
+the statement count must not change with library size; the script fails if it
+does.
+
+    python -m benchmarks.bench_smart_recommend --sets 10 100 1000
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.api.endpoints.learning import popular_sets_cache
+from app.core.config import settings
+from app.db.learning_stats import rebuild_set_stats
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.study_set import StudySet, Term
+from app.models.user import User
+from benchmarks.common import QueryCounter, auth_headers, build_app, create_sqlite_engine, summarize_ms
+
+STATUSES = [LearningStatus.NOT_STARTED, LearningStatus.FAMILIAR, LearningStatus.MASTERED]
+
+
+def grow_library(SessionLocal, user_id: int, other_id: int, start: int, stop: int, terms_per_set: int, rng: random.Random) -> None:
+    """
+    Sets [start, stop) for the measured user, every other one started, plus as
+    many public sets by another author.
+    """
+    db = SessionLocal()
+    now = datetime.now()
+    sets, terms, progress = [], [], []
+    for i in range(start, stop):
+        for offset, author_id in ((0, user_id), (1, other_id)):
+            set_id = 2 * i + offset + 1
+            sets.append(
+                {
+                    "id": set_id,
+                    "title": f"Set {set_id}",
+                    "author_id": author_id,
+                    "is_public": True,
+                    "view_count": rng.randint(0, 10000),
+                }
+            )
+            for j in range(terms_per_set):
+                term_id = set_id * terms_per_set + j
+                terms.append({"id": term_id, "study_set_id": set_id, "term": f"t{term_id}", "definition": "d", "order": j})
+                if author_id == user_id and i % 2:
+                    progress.append(
+                        {
+                            "user_id": user_id,
+                            "study_set_id": set_id,
+                            "term_id": term_id,
+                            "status": rng.choice(STATUSES),
+                            "last_reviewed": now - timedelta(hours=rng.randint(1, 500)),
+                        }
+                    )
+    db.execute(insert(StudySet.__table__), sets)
+    db.execute(insert(Term.__table__), terms)
+    if progress:
+        db.execute(insert(LearningProgress.__table__), progress)
+    rebuild_set_stats(db, user_id=user_id)
+    db.commit()
+    db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sets", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--terms-per-set", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    db = SessionLocal()
+    user = User(email="recommend@example.com", username="recommend", hashed_password="x", role="student")
+    other = User(email="author@example.com", username="author", hashed_password="x", role="teacher")
+    db.add_all([user, other])
+    db.commit()
+    user_id, other_id = user.id, other.id
+    db.close()
+
+    client = TestClient(app)
+    headers = auth_headers("recommend")
+    url = f"{settings.API_V1_STR}/learning/smart-recommend"
+
+    size = 0
+    query_counts = {}
+    for target in sorted(args.sets):
+        grow_library(SessionLocal, user_id, other_id, size, target, args.terms_per_set, rng)
+        size = target
+        client.get(url, headers=headers).raise_for_status()
+        for cold in (True, False):
+            samples = []
+            for _ in range(args.requests):
+                if cold:
+                    popular_sets_cache.clear()
+                with QueryCounter(engine) as counter:
+                    start = perf_counter()
+                    resp = client.get(url, headers=headers)
+                    samples.append((perf_counter() - start) * 1000)
+                resp.raise_for_status()
+            query_counts.setdefault(cold, set()).add(counter.count)
+            label = "cold" if cold else "warm"
+            print(f"{size:>5} own sets, {label} popular pool: {summarize_ms(samples)}, {counter.count} queries")
+
+    for cold, counts in query_counts.items():
+        if len(counts) != 1:
+            print(f"query count changed with library size ({'cold' if cold else 'warm'} pool): {sorted(counts)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Term update: edit a large study set through PUT /study-sets/{id} and count the
+statements it issues. Typical edit = a few changed, removed and added terms;
+unchanged terms cost nothing and keep their ids (and learning progress).
+For comparison the previous delete-everything-and-re-add strategy is replayed
+directly against the database.
+
+    python -m benchmarks.bench_term_update --terms 2000
+"""
+import argparse
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.study_set import StudySet, Term
+from app.models.user import User
+from benchmarks.common import QueryCounter, auth_headers, build_app, create_sqlite_engine
+
+
+def seed_set(SessionLocal, user_id: int, term_count: int) -> int:
+    db = SessionLocal()
+    study_set = StudySet(title="Large set", author_id=user_id, is_public=True)
+    db.add(study_set)
+    db.flush()
+    db.execute(
+        insert(Term.__table__),
+        [
+            {
+                "study_set_id": study_set.id,
+                "term": f"term {i}",
+                "definition": f"definition {i}",
+                "order": i,
+            }
+            for i in range(term_count)
+        ],
+    )
+    term_ids = [row.id for row in db.query(Term.id).filter(Term.study_set_id == study_set.id)]
+    db.execute(
+        insert(LearningProgress.__table__),
+        [
+            {
+                "user_id": user_id,
+                "study_set_id": study_set.id,
+                "term_id": term_id,
+                "status": LearningStatus.FAMILIAR,
+            }
+            for term_id in term_ids[::4]
+        ],
+    )
+    db.commit()
+    study_set_id = study_set.id
+    db.close()
+    return study_set_id
+
+
+def edited_payload(terms, changed: int, removed: int, added: int):
+    kept = terms[removed:]
+    payload = []
+    for idx, term in enumerate(kept):
+        definition = term["definition"]
+        if idx < changed:
+            definition += " (edited)"
+        payload.append(
+            {
+                "id": term["id"],
+                "term": term["term"],
+                "definition": definition,
+                "order": idx,
+            }
+        )
+    for i in range(added):
+        payload.append(
+            {"term": f"new term {i}", "definition": "new definition", "order": len(payload)}
+        )
+    return {"title": "Large set", "terms": payload}
+
+
+def legacy_replace_terms(SessionLocal, study_set_id: int, payload) -> None:
+    db = SessionLocal()
+    db.query(Term).filter(Term.study_set_id == study_set_id).delete()
+    db.flush()
+    for idx, term_payload in enumerate(payload["terms"]):
+        db.add(
+            Term(
+                study_set_id=study_set_id,
+                term=term_payload["term"],
+                definition=term_payload["definition"],
+                order=term_payload.get("order", idx),
+            )
+        )
+    db.commit()
+    db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, default=2000)
+    parser.add_argument("--changed", type=int, default=50)
+    parser.add_argument("--removed", type=int, default=20)
+    parser.add_argument("--added", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    db = SessionLocal()
+    user = User(email="editor@example.com", username="editor", hashed_password="x", role="student")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    study_set_id = seed_set(SessionLocal, user_id, args.terms)
+    client = TestClient(app)
+    headers = auth_headers("editor")
+    url = f"{settings.API_V1_STR}/study-sets/{study_set_id}"
+    terms = client.get(url, headers=headers).json()["terms"]
+
+    payload = edited_payload(terms, args.changed, args.removed, args.added)
+    with QueryCounter(engine) as counter:
+        start = perf_counter()
+        resp = client.put(url, json=payload, headers=headers)
+        elapsed_ms = (perf_counter() - start) * 1000
+    resp.raise_for_status()
+    after = resp.json()["terms"]
+    kept_ids = {term["id"] for term in terms[args.removed:]}
+    preserved = sum(1 for term in after if term["id"] in kept_ids)
+    db = SessionLocal()
+    progress_rows = db.query(LearningProgress).filter(LearningProgress.study_set_id == study_set_id).count()
+    db.close()
+
+    print(f"set size         : {args.terms} terms ({args.changed} changed, {args.removed} removed, {args.added} added)")
+    print(f"diff update      : {counter.count} statements, {elapsed_ms:.1f}ms (including response)")
+    print(f"ids preserved    : {preserved}/{len(kept_ids)}, progress rows left: {progress_rows}")
+
+    # Saving the set again without edits should not write anything
+    resave = {"title": "Large set", "terms": after}
+    with QueryCounter(engine) as counter:
+        start = perf_counter()
+        client.put(url, json=resave, headers=headers).raise_for_status()
+        elapsed_ms = (perf_counter() - start) * 1000
+    writes = sum(1 for s in counter.statements if not s.lstrip().upper().startswith("SELECT"))
+    print(f"unchanged resave : {counter.count} statements ({writes} writes), {elapsed_ms:.1f}ms")
+
+    with QueryCounter(engine) as counter:
+        start = perf_counter()
+        legacy_replace_terms(SessionLocal, study_set_id, payload)
+        elapsed_ms = (perf_counter() - start) * 1000
+    print(f"delete + re-add  : {counter.count} statements, {elapsed_ms:.1f}ms (writes only)")
+
+
+if __name__ == "__main__":
+    main()
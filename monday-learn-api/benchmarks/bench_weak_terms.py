@@ -0,0 +1,143 @@
+"""
+Weak terms: grow one user's answer history over a fixed library and time
+GET /learning/weak-terms. Attempts and errors are kept per (user, term) in
+learning_term_stats as logs are written, so latency follows the number of
+terms the user has answered rather than the number of answers; the grouped
+scan over learning_progress_logs it replaces is timed alongside.
+
+    python -m benchmarks.bench_weak_terms --logs 10000 100000 1000000
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import case, func, insert
+
+from app.core.config import settings
+from app.db.learning_logs import write_learning_logs
+from app.models.learning_progress import LearningProgress, LearningStatus
+from app.models.learning_progress_log import LearningProgressLog
+from app.models.study_set import StudySet, Term
+from app.models.user import User
+from benchmarks.common import QueryCounter, auth_headers, build_app, create_sqlite_engine, summarize_ms
+
+STATUSES = [LearningStatus.NOT_STARTED, LearningStatus.FAMILIAR, LearningStatus.MASTERED]
+CHUNK = 50000
+
+
+def seed_library(SessionLocal, user_id: int, terms: int, rng: random.Random) -> None:
+    """``terms`` terms in sets of 100, with progress on every one of them."""
+    db = SessionLocal()
+    now = datetime.now()
+    db.execute(
+        insert(StudySet.__table__),
+        [{"id": i + 1, "title": f"Set {i}", "author_id": user_id} for i in range((terms + 99) // 100)],
+    )
+    db.execute(
+        insert(Term.__table__),
+        [{"id": i + 1, "study_set_id": i // 100 + 1, "term": f"t{i}", "definition": "d", "order": i % 100} for i in range(terms)],
+    )
+    db.execute(
+        insert(LearningProgress.__table__),
+        [
+            {
+                "user_id": user_id,
+                "study_set_id": i // 100 + 1,
+                "term_id": i + 1,
+                "status": rng.choice(STATUSES),
+                "last_reviewed": now - timedelta(hours=rng.randint(1, 500)),
+            }
+            for i in range(terms)
+        ],
+    )
+    db.commit()
+    db.close()
+
+
+def grow_history(SessionLocal, user_id: int, terms: int, count: int, rng: random.Random) -> None:
+    """Write ``count`` more answer logs the way the API does."""
+    db = SessionLocal()
+    now = datetime.now()
+    for start in range(0, count, CHUNK):
+        rows = []
+        for _ in range(min(CHUNK, count - start)):
+            term_id = rng.randint(1, terms)
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "study_set_id": (term_id - 1) // 100 + 1,
+                    "term_id": term_id,
+                    "mode": "learn",
+                    "is_correct": rng.random() < 0.7,
+                    "created_at": now,
+                }
+            )
+        write_learning_logs(db, rows)
+        db.commit()
+    db.close()
+
+
+def full_aggregation(SessionLocal, user_id: int) -> int:
+    """The per-request scan weak terms replaces: group the whole history by term."""
+    db = SessionLocal()
+    rows = (
+        db.query(
+            LearningProgressLog.term_id,
+            func.count(LearningProgressLog.id),
+            func.sum(case((LearningProgressLog.is_correct.is_(False), 1), else_=0)),
+        )
+        .filter(LearningProgressLog.user_id == user_id)
+        .group_by(LearningProgressLog.term_id, LearningProgressLog.study_set_id)
+        .all()
+    )
+    db.close()
+    return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logs", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--terms", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    engine = create_sqlite_engine()
+    app, SessionLocal = build_app(engine)
+    db = SessionLocal()
+    user = User(email="weak@example.com", username="weak", hashed_password="x", role="student")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+    seed_library(SessionLocal, user_id, args.terms, rng)
+
+    client = TestClient(app)
+    headers = auth_headers("weak")
+    url = f"{settings.API_V1_STR}/learning/weak-terms"
+
+    size = 0
+    for target in sorted(args.logs):
+        grow_history(SessionLocal, user_id, args.terms, target - size, rng)
+        size = target
+        samples = []
+        for _ in range(args.requests):
+            with QueryCounter(engine) as counter:
+                start = perf_counter()
+                resp = client.get(url, headers=headers)
+                samples.append((perf_counter() - start) * 1000)
+            resp.raise_for_status()
+
+        start = perf_counter()
+        full_aggregation(SessionLocal, user_id)
+        scan_ms = (perf_counter() - start) * 1000
+        print(
+            f"{size:>8} logs: {summarize_ms(samples)}, {counter.count} queries, "
+            f"{len(resp.json()['items'])} items; full log aggregation {scan_ms:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
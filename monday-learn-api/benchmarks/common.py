@@ -0,0 +1,108 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+
+Each benchmark builds the API router against a throwaway SQLite database so it
+runs without a MySQL server. Run them from the monday-learn-api directory, e.g.:
+
+    python -m benchmarks.bench_login_storm
+"""
+import importlib
+import os
+import pkgutil
+import statistics
+import tempfile
+from typing import Dict, List, Tuple
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.api import routes
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import ThreadedSession, get_async_db, get_db
+
+# Register every model on Base.metadata
+for _module in pkgutil.iter_modules(app.models.__path__):
+    importlib.import_module(f"app.models.{_module.name}")
+
+
+def create_sqlite_engine(path: str | None = None) -> Engine:
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="monday-learn-bench-", suffix=".db")
+        os.close(fd)
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def build_app(engine: Engine) -> Tuple[FastAPI, sessionmaker]:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        db = SessionLocal()
+        try:
+            yield ThreadedSession(db)
+        finally:
+            db.close()
+
+    api = FastAPI(title="Monday Learn API (benchmark)")
+    api.include_router(routes.api_router, prefix=settings.API_V1_STR)
+    api.dependency_overrides[get_db] = override_get_db
+    api.dependency_overrides[get_async_db] = override_get_async_db
+    return api, SessionLocal
+
+
+def auth_headers(username: str) -> Dict[str, str]:
+    token = create_access_token({"sub": username, "role": "student"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class QueryCounter:
+    """Counts statements sent to the database while the context is active."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[str] = []
+        self.parameters: List = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def __enter__(self) -> "QueryCounter":
+        self.statements = []
+        self.parameters = []
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+def summarize_ms(samples: List[float]) -> str:
+    if not samples:
+        return "n=0"
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"n={len(ordered)} p50={statistics.median(ordered):.1f}ms "
+        f"p95={p95:.1f}ms max={ordered[-1]:.1f}ms"
+    )
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
@@ -8,10 +9,16 @@ from app.core.logger import setup_logging
 from app.db.session import get_db, engine
 from app.db.base import Base
 from app.db.migrations import run_migrations
+from app.db.learning_logs import learning_log_writer
+from app.db.search import search_index_writer
+from app.db.study_set_views import study_set_view_writer
 # Import models to ensure they are registered
 from app.models.user import User
 from app.models.login_log import LoginLog
 from app.models.study_set import StudySet, Term
+from app.models.study_set_search_doc import StudySetSearchDoc
+from app.models.learning_set_stats import LearningSetStats
+from app.models.learning_term_stats import LearningTermStats
 from app.models.material import Material
 from app.models.folder import Folder
 from app.models.learning_progress import LearningProgress
@@ -31,7 +38,19 @@ run_migrations(engine)
 # Setup logging
 setup_logging()
 
-app = FastAPI(title="Monday Learn API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    learning_log_writer.start()
+    study_set_view_writer.start()
+    search_index_writer.start()
+    yield
+    # Drain buffered answer logs, view counts and reindexing before the workers exit
+    learning_log_writer.stop()
+    study_set_view_writer.stop()
+    search_index_writer.stop()
+
+
+app = FastAPI(title="Monday Learn API", lifespan=lifespan)
 
 # Configure CORS
 env_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173")
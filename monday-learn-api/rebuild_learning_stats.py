@@ -0,0 +1,40 @@
+"""
+Recompute the per-(user, set) mastery counters in learning_set_stats from
+learning_progress, and the per-(user, term) answer counters in
+learning_term_stats from learning_progress_logs.
+
+    python rebuild_learning_stats.py                   # every user and set
+    python rebuild_learning_stats.py --user-id 42      # one user
+    python rebuild_learning_stats.py --study-set-id 7  # one set
+
+Run from the monday-learn-api directory against SQLALCHEMY_DATABASE_URI. The
+running API keeps the counters current on its own; a rebuild is only needed
+after progress or logs are changed outside it.
+"""
+import argparse
+from time import perf_counter
+
+from app.db.learning_logs import rebuild_term_stats
+from app.db.learning_stats import rebuild_set_stats
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--study-set-id", type=int)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    db = SessionLocal()
+    try:
+        rebuild_set_stats(db, user_id=args.user_id, study_set_id=args.study_set_id)
+        rebuild_term_stats(db, user_id=args.user_id, study_set_id=args.study_set_id)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt learning_set_stats and learning_term_stats in {perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
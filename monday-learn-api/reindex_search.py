@@ -0,0 +1,73 @@
+"""
+Rebuild or check the study set search index offline.
+
+    python reindex_search.py                      # reindex every set
+    python reindex_search.py --workers 4 --batch-size 500
+    python reindex_search.py --check              # report drift, exit 1 if any
+    python reindex_search.py --check --fix        # reindex only drifted sets
+
+Run from the monday-learn-api directory against SQLALCHEMY_DATABASE_URI. The
+running API keeps refreshing docs on its own; a rebuild is only needed after
+bulk changes made outside it, or when --check reports drift.
+"""
+import argparse
+import sys
+from time import perf_counter
+
+from app.db.migrations import ensure_study_set_search_index
+from app.db.search import check_search_docs, rebuild_fts_index, rebuild_search_docs
+from app.db.session import SessionLocal, engine
+
+
+def print_drift(drift) -> None:
+    print(f"sets: {drift['sets']}, docs: {drift['docs']}")
+    for key in ("missing", "orphaned", "stale"):
+        ids = drift[key]
+        sample = ", ".join(str(i) for i in ids[:20]) + (" ..." if len(ids) > 20 else "")
+        print(f"{key:>9}: {len(ids)}" + (f" ({sample})" if ids else ""))
+    if drift["index_error"]:
+        print(f"    index: {drift['index_error']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="compare docs with study sets and terms instead of rebuilding")
+    parser.add_argument("--fix", action="store_true", help="with --check, reindex the sets that drifted")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    ensure_study_set_search_index(engine)
+    start = perf_counter()
+
+    if not args.check:
+        count = rebuild_search_docs(SessionLocal, batch_size=args.batch_size, workers=args.workers)
+        print(f"Reindexed {count} study sets in {perf_counter() - start:.1f}s")
+        return
+
+    db = SessionLocal()
+    try:
+        drift = check_search_docs(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print_drift(drift)
+    print(f"Checked in {perf_counter() - start:.1f}s")
+    if drift["ok"]:
+        return
+    if not args.fix:
+        sys.exit(1)
+
+    if drift["index_error"]:
+        rebuild_fts_index(engine)
+        print("Rebuilt the full-text index")
+
+    # Orphaned ids have no set, so refreshing them deletes their doc
+    ids = drift["missing"] + drift["stale"] + drift["orphaned"]
+    if not ids:
+        return
+    count = rebuild_search_docs(SessionLocal, batch_size=args.batch_size, workers=args.workers, study_set_ids=ids)
+    print(f"Reindexed {count} drifted study sets")
+
+
+if __name__ == "__main__":
+    main()
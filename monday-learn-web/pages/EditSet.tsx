@@ -171,6 +171,8 @@ export const EditSet: React.FC = () => {
     return terms
       .filter(t => t.term.trim() || t.definition.trim())
       .map((t, index) => ({
+        // Numeric ids are existing terms; the API keeps them (and their progress)
+        id: typeof t.id === 'number' ? t.id : undefined,
         term: t.term.trim(),
         definition: t.definition.trim(),
         image_url: t.imageUrl || null,
@@ -389,7 +389,7 @@ export const Home: React.FC = () => {
             setLoadingSets(true);
             setSetsError('');
             try {
-                const data = await api.get<StudySet[]>('/study-sets');
+                const data = await api.get<StudySet[]>('/study-sets?fields=summary');
                 const normalized = (data || []).map(normalizeSet);
                 setStudySets(normalized);
             } catch (err: any) {
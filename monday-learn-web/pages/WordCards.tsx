@@ -17,7 +17,7 @@ export const WordCards: React.FC = () => {
         const fetchLibrary = async () => {
             setLoading(true);
             try {
-                const data = await api.get<StudySet[]>('/study-sets/library');
+                const data = await api.get<StudySet[]>('/study-sets/library?fields=summary');
                 const normalized = (data || []).map(normalizeStudySet);
                 setSets(normalized);
             } catch (err: any) {